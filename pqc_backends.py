@@ -0,0 +1,128 @@
+# pqc_backends.py
+# 🔌 REGISTRO COMPARTILHADO DE BACKENDS PQC REAIS (liboqs)
+"""
+Um único backend REAL por família de algoritmos, criado sob demanda.
+
+Antes, cada chamada a generate_sphincs_keypair / generate_falcon_keypair
+criava um QuantumSecuritySystemREAL novo (contexto liboqs + memória por
+chave) e guardava o objeto dentro do keypair. Agora:
+
+- Backends são criados uma vez por família ("ml_dsa", "sphincs", "falcon")
+  e reutilizados por todos os keypairs (ou o backend já existente do
+  sistema é compartilhado por todas as famílias)
+- Keypairs guardam apenas o handle (string) em "_backend_handle"
+- Objetos oqs.Signature são reutilizados por variante (por thread,
+  pois não são thread-safe) para verificação, e por keypair para assinar
+  com chaves secretas restauradas do keystore
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from pqc_cache import BoundedCache
+
+FAMILIES = ("ml_dsa", "sphincs", "falcon")
+
+
+def _default_factory():
+    """Criar backend REAL (levanta ImportError se liboqs não estiver disponível)"""
+    from quantum_security_REAL import QuantumSecuritySystemREAL, LIBOQS_AVAILABLE
+    if not LIBOQS_AVAILABLE:
+        raise ImportError("liboqs-python não disponível")
+    return QuantumSecuritySystemREAL()
+
+
+class PQCBackendRegistry:
+    """Registro de backends REAIS: um por família, criado sob demanda"""
+
+    def __init__(self, factory: Optional[Callable[[], Any]] = None, shared_backend: Any = None, max_signing_contexts: int = 1000):
+        self._factory = factory or _default_factory
+        self.max_signing_contexts = max_signing_contexts
+        self._backends: Dict[str, Any] = {}
+        self._unavailable: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if shared_backend is not None:
+            # Backend já construído (ex: QuantumSecuritySystem.real_pqc_system) atende todas as famílias
+            for family in FAMILIES:
+                self._backends[family] = shared_backend
+
+    def get(self, family: str) -> Optional[Any]:
+        """Obter backend da família (criando na primeira vez). None se indisponível."""
+        backend = self._backends.get(family)
+        if backend is not None or family in self._unavailable:
+            return backend
+        with self._lock:
+            if family in self._backends:
+                return self._backends[family]
+            if family in self._unavailable:
+                return None
+            try:
+                backend = self._factory()
+            except ImportError as e:
+                self._unavailable[family] = str(e)
+                return None
+            self._backends[family] = backend
+            return backend
+
+    def resolve(self, keypair: Dict) -> Optional[Any]:
+        """
+        Backend de um keypair a partir do handle armazenado. Handles de família
+        conhecida (ex: keypairs restaurados do keystore) criam o backend sob demanda.
+        """
+        handle = keypair.get("_backend_handle") if keypair is not None else None
+        if not handle:
+            return None
+        backend = self._backends.get(handle)
+        if backend is None and handle in FAMILIES:
+            backend = self.get(handle)
+        return backend
+
+    def oqs_signature(self, variant: str):
+        """oqs.Signature reutilizável por variante (cache por thread - objetos não são thread-safe)"""
+        contexts = getattr(self._local, "contexts", None)
+        if contexts is None:
+            contexts = self._local.contexts = {}
+        sig = contexts.get(variant)
+        if sig is None:
+            import oqs
+            sig = contexts[variant] = oqs.Signature(variant)
+        return sig
+
+    def _signing_context(self, keypair_id: str, variant: str, secret_key: bytes):
+        """oqs.Signature com a chave secreta carregada (cache por thread e keypair)"""
+        contexts = getattr(self._local, "signing_contexts", None)
+        if contexts is None:
+            contexts = self._local.signing_contexts = BoundedCache(
+                "oqs_signing_contexts", max_entries=self.max_signing_contexts
+            )
+        cached = contexts.get(keypair_id)
+        # Chave rotacionada (outra variante/segredo) -> recriar o contexto
+        if cached is not None and cached[0] == variant and cached[1] == secret_key:
+            return cached[2]
+        import oqs
+        sig = oqs.Signature(variant, secret_key)
+        contexts.put(keypair_id, (variant, secret_key, sig), size=len(secret_key))
+        return sig
+
+    def sign_with_secret_key(self, variant: str, message: bytes, secret_key: bytes, keypair_id: Optional[str] = None) -> bytes:
+        """
+        Assinar com chave secreta exportada (keypairs REAIS restaurados do
+        keystore). Com keypair_id o contexto oqs é reutilizado entre chamadas.
+        """
+        if keypair_id is None:
+            import oqs
+            with oqs.Signature(variant, secret_key) as sig:
+                return sig.sign(message)
+        return self._signing_context(keypair_id, variant, secret_key).sign(message)
+
+    def verify(self, variant: str, message: bytes, signature: bytes, public_key: bytes) -> bool:
+        """Verificar assinatura com contexto oqs reutilizado"""
+        return bool(self.oqs_signature(variant).verify(message, signature, public_key))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backends": sorted(self._backends),
+            "unavailable": dict(self._unavailable),
+            "distinct_instances": len({id(b) for b in self._backends.values()})
+        }
@@ -0,0 +1,418 @@
+# pqc_block_packing.py
+# 🗜️ EMPACOTAMENTO DE ASSINATURAS POR BLOCO (SELEÇÃO DE CODEC + DICIONÁRIO)
+"""
+Compressão no nível do bloco em vez de por assinatura.
+
+Assinaturas PQC são bytes aleatórios (quase não comprimem) e o
+enquadramento por assinatura (gzip + base64) domina o tamanho. Aqui o
+conjunto de assinaturas de um bloco vira dois fluxos:
+
+- metadados (campos estruturados: keypair_id, algoritmo, timestamps...)
+  em JSON compacto por linha - comprimidos com dicionário compartilhado
+  (zlib zdict ou zstd treinado, se `zstandard` estiver instalado)
+- assinaturas brutas concatenadas (base64 decodificado)
+
+Cada fluxo usa o codec que gerar menos bytes no lote (raw, zlib,
+zlib-dict, zstd, zstd-dict). Layout (big-endian), versão 1:
+
+    cabeçalho : magic "QP" | versão u8 | quantidade u32 | dict_id (4 bytes)
+    seção     : fluxo u8 | codec u8 | tamanho original u32 | tamanho u32 | payload
+                (metadados primeiro, depois assinaturas)
+
+O descompressor é incremental: lê de bytes ou arquivo em chunks e
+produz uma assinatura por vez (memória limitada pelo chunk). A saída de
+cada seção é limitada ao tamanho original declarado (proteção contra
+"bombas" de descompressão).
+"""
+
+import io
+import json
+import zlib
+import base64
+import struct
+import hashlib
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+MAGIC = b"QP"
+VERSION = 1
+
+STREAM_META = 1
+STREAM_SIGNATURES = 2
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZLIB_DICT = 2
+CODEC_ZSTD = 3
+CODEC_ZSTD_DICT = 4
+
+CODEC_NAMES = {
+    CODEC_RAW: "raw",
+    CODEC_ZLIB: "zlib",
+    CODEC_ZLIB_DICT: "zlib-dict",
+    CODEC_ZSTD: "zstd",
+    CODEC_ZSTD_DICT: "zstd-dict"
+}
+CODEC_IDS = {name: codec for codec, name in CODEC_NAMES.items()}
+
+_HEADER = struct.Struct(">2sBI4s")
+_SECTION = struct.Struct(">BBII")
+
+# Campos estruturados típicos das assinaturas do QuantumSecuritySystem (dicionário padrão)
+DEFAULT_DICTIONARY = "".join(
+    json.dumps(sample, separators=(",", ":"), sort_keys=True) + "\n"
+    for sample in (
+        {"_sigs": [["classic_signature", 72], ["ml_dsa_signature", 64], ["sphincs_signature", 64]],
+         "algorithm": "QRS-3", "keypair_id": "qrs3_", "quantum_resistant": True, "redundancy_level": 3},
+        {"_sigs": [["classic_signature", 71], ["ml_dsa_signature", 64]],
+         "algorithm": "QRS-2", "keypair_id": "qrs2_", "quantum_resistant": True, "redundancy_level": 2},
+        {"_sigs": [["signature", 64]], "algorithm": "ML-DSA", "implementation": "simulated", "keypair_id": "ml_dsa_"},
+        {"_sigs": [["signature", 64]], "algorithm": "SPHINCS+", "implementation": "simulated", "keypair_id": "sphincs_"},
+        {"_sigs": [["signature", 64]], "algorithm": "FALCON", "implementation": "real", "keypair_id": "falcon_"},
+        {"classic_algorithm": "ECDSA-secp256k1", "signed_at": "2025-01-01T00:00:00", "timestamp": "2025-01-01T00:00:00"}
+    )
+).encode()
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class PackingFormatError(ValueError):
+    """Bloco empacotado truncado, versão/codec desconhecido ou dicionário ausente"""
+
+
+def dictionary_id(dictionary: bytes) -> bytes:
+    return hashlib.sha256(dictionary).digest()[:4]
+
+
+def _is_signature_field(key: str, value: Any) -> bool:
+    return isinstance(value, str) and key.endswith("signature") and key != "message"
+
+
+def _decode_signature(value: str) -> Optional[bytes]:
+    """Bytes da assinatura base64; None se o valor não for base64 canônico"""
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except ValueError:
+        return None
+    return raw if base64.b64encode(raw).decode() == value else None
+
+
+def split_record(record: Union[Dict, str]) -> Tuple[bytes, List[bytes]]:
+    """Separar campos estruturados (linha JSON) das assinaturas brutas"""
+    if isinstance(record, str):
+        record = {"signature": record}
+    meta = {}
+    signatures = []
+    layout = []
+    for key, value in record.items():
+        raw = _decode_signature(value) if _is_signature_field(key, value) else None
+        if raw is not None:
+            layout.append([key, len(raw)])
+            signatures.append(raw)
+        else:
+            meta[key] = value
+    if layout:
+        meta["_sigs"] = layout
+    line = json.dumps(meta, separators=(",", ":"), sort_keys=True, default=str).encode() + b"\n"
+    return line, signatures
+
+
+class _SectionReader:
+    """Leitura limitada aos `size` bytes de uma seção (erro se o bloco terminar antes)"""
+
+    def __init__(self, reader, size: int):
+        self._reader = reader
+        self.remaining = size
+
+    def read(self, size: int = -1) -> bytes:
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        if not size:
+            return b""
+        data = self._reader.read(size)
+        if not data:
+            raise PackingFormatError("Bloco empacotado truncado")
+        self.remaining -= len(data)
+        return data
+
+
+class SignatureBlockPacker:
+    """Empacota assinaturas de um bloco escolhendo o melhor codec por fluxo"""
+
+    def __init__(self, dictionary: bytes = DEFAULT_DICTIONARY, level: int = 9, codecs: Optional[Sequence[str]] = None):
+        self.level = level
+        self.codecs = tuple(codecs) if codecs else tuple(CODEC_NAMES.values())
+        self._dictionaries: Dict[bytes, bytes] = {}
+        self.dictionary = b""
+        self.dictionary_id = b"\x00" * 4
+        self.set_dictionary(dictionary)
+
+    # ------------------------------------------------------------------
+    # Dicionário compartilhado
+    # ------------------------------------------------------------------
+
+    def set_dictionary(self, dictionary: bytes) -> bytes:
+        """Ativar dicionário (mantém os anteriores para descompactar blocos antigos)"""
+        dict_id = dictionary_id(dictionary)
+        self._dictionaries[dict_id] = dictionary
+        self.dictionary, self.dictionary_id = dictionary, dict_id
+        return dict_id
+
+    def add_dictionary(self, dictionary: bytes) -> bytes:
+        """Registrar dicionário só para descompactação (validadores)"""
+        dict_id = dictionary_id(dictionary)
+        self._dictionaries[dict_id] = dictionary
+        return dict_id
+
+    def train_dictionary(self, sample_blocks: Iterable[Sequence[Union[Dict, str]]], size: int = 16 * 1024) -> bytes:
+        """
+        Treinar dicionário a partir de blocos de exemplo (só os metadados).
+        zstd: train_dictionary; senão: linhas mais frequentes até `size`
+        (as mais comuns no fim, onde o zlib as alcança com menor distância).
+        """
+        lines = [split_record(record)[0] for block in sample_blocks for record in block]
+        if not lines:
+            raise ValueError("Sem amostras para treinar dicionário")
+        dictionary = None
+        if ZSTD_AVAILABLE and len(lines) >= 8:
+            try:
+                dictionary = zstandard.train_dictionary(size, lines).as_bytes()
+            except Exception:
+                dictionary = None
+        if dictionary is None:
+            common = [line for line, _ in Counter(lines).most_common()]
+            selected, total = [], 0
+            for line in common:
+                if total + len(line) > size:
+                    break
+                selected.append(line)
+                total += len(line)
+            dictionary = b"".join(reversed(selected))
+        return self.set_dictionary(DEFAULT_DICTIONARY + dictionary if len(dictionary) < size else dictionary)
+
+    # ------------------------------------------------------------------
+    # Codecs
+    # ------------------------------------------------------------------
+
+    def _available_codecs(self) -> List[int]:
+        codecs = []
+        for name in self.codecs:
+            codec = CODEC_IDS.get(name)
+            if codec is None:
+                continue
+            if codec in (CODEC_ZSTD, CODEC_ZSTD_DICT) and not ZSTD_AVAILABLE:
+                continue
+            codecs.append(codec)
+        return codecs or [CODEC_RAW]
+
+    def _compress(self, codec: int, data: bytes) -> bytes:
+        if codec == CODEC_RAW:
+            return data
+        if codec == CODEC_ZLIB:
+            return zlib.compress(data, self.level)
+        if codec == CODEC_ZLIB_DICT:
+            compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+            return compressor.compress(data) + compressor.flush()
+        if codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=min(self.level * 2, 19)).compress(data)
+        compression_dict = zstandard.ZstdCompressionDict(self.dictionary)
+        return zstandard.ZstdCompressor(level=min(self.level * 2, 19), dict_data=compression_dict).compress(data)
+
+    def _best(self, data: bytes, candidates: List[int]) -> Tuple[int, bytes, Dict[str, int]]:
+        """Menor saída entre os codecs (empate: o primeiro - raw é o mais barato)"""
+        best_codec, best = CODEC_RAW, data
+        tried = {"raw": len(data)}
+        for codec in candidates:
+            if codec == CODEC_RAW:
+                continue
+            try:
+                output = self._compress(codec, data)
+            except Exception:
+                continue
+            tried[CODEC_NAMES[codec]] = len(output)
+            if len(output) < len(best):
+                best_codec, best = codec, output
+        return best_codec, best, tried
+
+    # ------------------------------------------------------------------
+    # Empacotar / desempacotar
+    # ------------------------------------------------------------------
+
+    def pack(self, records: Sequence[Union[Dict, str]]) -> Dict[str, Any]:
+        """Empacotar assinaturas de um bloco; retorna bytes + relatório de tamanho"""
+        meta_lines, raw_signatures = [], []
+        json_bytes = 0
+        for record in records:
+            line, signatures = split_record(record)
+            meta_lines.append(line)
+            raw_signatures.extend(signatures)
+            json_bytes += len(json.dumps(record if isinstance(record, dict) else {"signature": record},
+                                         separators=(",", ":"), default=str))
+        meta = b"".join(meta_lines)
+        signature_stream = b"".join(raw_signatures)
+
+        candidates = self._available_codecs()
+        meta_codec, meta_payload, meta_tried = self._best(meta, candidates)
+        # Sem dicionário para bytes aleatórios (só ocuparia a janela)
+        signature_candidates = [c for c in candidates if c not in (CODEC_ZLIB_DICT, CODEC_ZSTD_DICT)]
+        sig_codec, sig_payload, sig_tried = self._best(signature_stream, signature_candidates)
+
+        packed = b"".join((
+            _HEADER.pack(MAGIC, VERSION, len(records), self.dictionary_id),
+            _SECTION.pack(STREAM_META, meta_codec, len(meta), len(meta_payload)),
+            meta_payload,
+            _SECTION.pack(STREAM_SIGNATURES, sig_codec, len(signature_stream), len(sig_payload)),
+            sig_payload
+        ))
+        per_signature_b64 = sum(len(base64.b64encode(raw)) for raw in raw_signatures)
+        return {
+            "packed": packed,
+            "report": {
+                "signatures": len(records),
+                "signature_components": len(raw_signatures),
+                "json_bytes": json_bytes,
+                "base64_signature_bytes": per_signature_b64,
+                "raw_signature_bytes": len(signature_stream),
+                "metadata_bytes": len(meta),
+                "packed_bytes": len(packed),
+                "bytes_saved": json_bytes - len(packed),
+                "saved_percent": (1 - len(packed) / json_bytes) * 100 if json_bytes else 0.0,
+                "codecs": {"metadata": CODEC_NAMES[meta_codec], "signatures": CODEC_NAMES[sig_codec]},
+                "candidates": {"metadata": meta_tried, "signatures": sig_tried},
+                "dictionary_id": self.dictionary_id.hex()
+            }
+        }
+
+    def _decompressor(self, codec: int, dict_id: bytes):
+        """zlib: decompressobj incremental; zstd: ZstdDecompressor (lido via stream_reader)"""
+        if codec in (CODEC_ZLIB_DICT, CODEC_ZSTD_DICT):
+            dictionary = self._dictionaries.get(dict_id)
+            if dictionary is None:
+                raise PackingFormatError(f"Dicionário desconhecido: {dict_id.hex()}")
+        if codec == CODEC_RAW:
+            return None
+        if codec == CODEC_ZLIB:
+            return zlib.decompressobj()
+        if codec == CODEC_ZLIB_DICT:
+            return zlib.decompressobj(zdict=dictionary)
+        if not ZSTD_AVAILABLE:
+            raise PackingFormatError("Bloco usa zstd, mas zstandard não está instalado")
+        if codec == CODEC_ZSTD:
+            return zstandard.ZstdDecompressor()
+        return zstandard.ZstdDecompressor(dict_data=zstandard.ZstdCompressionDict(dictionary))
+
+    def _iter_section(
+        self, reader, codec: int, size: int, original_size: int, dict_id: bytes, chunk_size: int
+    ) -> Iterator[bytes]:
+        """
+        Chunks descomprimidos de uma seção (lendo `size` bytes do reader).
+        Cada chamada ao descompressor produz no máximo `chunk_size` bytes e o
+        total é conferido a cada chunk contra `original_size`.
+        """
+        decompressor = self._decompressor(codec, dict_id)
+        section = _SectionReader(reader, size)
+        produced = 0
+
+        def bounded(output: bytes) -> bytes:
+            nonlocal produced
+            produced += len(output)
+            if produced > original_size:
+                raise PackingFormatError("Seção descomprime além do tamanho declarado")
+            return output
+
+        if codec in (CODEC_ZSTD, CODEC_ZSTD_DICT):
+            stream = decompressor.stream_reader(section, read_size=chunk_size)
+            while True:
+                output = stream.read(min(chunk_size, original_size - produced + 1))
+                if not output:
+                    break
+                yield bounded(output)
+            if section.remaining:
+                raise PackingFormatError("Bytes extras na seção comprimida")
+        else:
+            while section.remaining:
+                data = section.read(chunk_size)
+                if decompressor is None:
+                    yield bounded(data)
+                    continue
+                while data:
+                    output = decompressor.decompress(data, min(chunk_size, original_size - produced + 1))
+                    data = decompressor.unconsumed_tail
+                    if output:
+                        yield bounded(output)
+            if decompressor is not None:
+                tail = decompressor.flush(min(chunk_size, original_size - produced + 1))
+                if tail:
+                    yield bounded(tail)
+        if produced != original_size:
+            raise PackingFormatError("Tamanho descomprimido inconsistente")
+
+    def iter_unpack(
+        self, source: Union[BytesLike, Any], chunk_size: int = 64 * 1024, max_metadata_size: int = 64 * 1024 * 1024
+    ) -> Iterator[Dict]:
+        """
+        Descompressor incremental para validadores: `source` é bytes ou
+        arquivo binário; produz um registro (dict com assinaturas base64)
+        por vez. Metadados (pequenos, no máximo `max_metadata_size`) são
+        lidos primeiro; o fluxo de assinaturas é consumido em chunks.
+        """
+        reader = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+
+        def read_exact(size: int) -> bytes:
+            data = reader.read(size)
+            if len(data) != size:
+                raise PackingFormatError("Bloco empacotado truncado")
+            return data
+
+        magic, version, count, dict_id = _HEADER.unpack(read_exact(_HEADER.size))
+        if magic != MAGIC:
+            raise PackingFormatError("Magic inválido: não é um bloco de assinaturas empacotado")
+        if version != VERSION:
+            raise PackingFormatError(f"Versão não suportada: {version}")
+
+        stream, codec, original_size, size = _SECTION.unpack(read_exact(_SECTION.size))
+        if stream != STREAM_META:
+            raise PackingFormatError("Seção de metadados ausente")
+        if original_size > max_metadata_size:
+            raise PackingFormatError(f"Metadados declarados ({original_size} bytes) acima do limite")
+        meta = b"".join(self._iter_section(reader, codec, size, original_size, dict_id, chunk_size))
+        lines = meta.splitlines()
+        if len(lines) != count:
+            raise PackingFormatError("Quantidade de registros inconsistente")
+
+        stream, codec, original_size, size = _SECTION.unpack(read_exact(_SECTION.size))
+        if stream != STREAM_SIGNATURES:
+            raise PackingFormatError("Seção de assinaturas ausente")
+        chunks = self._iter_section(reader, codec, size, original_size, dict_id, chunk_size)
+        buffer = bytearray()
+        consumed = 0
+
+        def take(length: int) -> bytes:
+            nonlocal buffer
+            while len(buffer) < length:
+                try:
+                    buffer += next(chunks)
+                except StopIteration:
+                    raise PackingFormatError("Fluxo de assinaturas truncado") from None
+            data = bytes(buffer[:length])
+            del buffer[:length]
+            return data
+
+        b64encode = base64.b64encode
+        for line in lines:
+            record = json.loads(line)
+            for key, length in record.pop("_sigs", ()):
+                record[key] = b64encode(take(length)).decode()
+                consumed += length
+            yield record
+        if consumed != original_size or buffer or next(chunks, b""):
+            raise PackingFormatError("Bytes extras no fluxo de assinaturas")
+
+    def unpack(self, packed: BytesLike) -> List[Dict]:
+        return list(self.iter_unpack(packed))
@@ -0,0 +1,407 @@
+# pqc_cache.py
+# 🗄️ CACHE LIMITADO (LRU + TTL) PARA ASSINATURAS E CHAVES PQC
+"""
+Cache thread-safe com get/put O(1) baseado em OrderedDict.
+
+Cada namespace é um BoundedCache independente com:
+- Limite de entradas (LRU)
+- Orçamento de bytes (estimado ou informado pelo chamador)
+- TTL opcional por entrada
+- Estatísticas (hits, misses, evictions, expirations, bytes)
+
+O PQCCacheManager agrupa os namespaces para expor estatísticas
+consolidadas (ex: cache de componentes SPHINCS+ e cache QRS-3 completo).
+
+PartitionedCache divide um mesmo orçamento entre partições (ex: uma por
+blockchain) com cota de entradas/bytes por partição, para que um único
+cliente não expulse os demais.
+"""
+
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Estimar tamanho em bytes de um valor armazenado no cache"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return 64 + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class BoundedCache:
+    """
+    Cache LRU + TTL com orçamento de entradas e de bytes.
+    Todas as operações são O(1) (amortizado) e protegidas por lock.
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[Any, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "puts": 0
+        }
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Buscar valor (atualiza ordem LRU). Entradas expiradas contam como miss."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats["misses"] += 1
+                return default
+
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key: Any, value: Any, size: Optional[int] = None, ttl_seconds: Optional[float] = None) -> bool:
+        """
+        Armazenar valor. Retorna False se o valor sozinho excede o orçamento de bytes.
+        """
+        if size is None:
+            size = estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            self._stats["puts"] += 1
+
+            # Evição LRU por número de entradas e por bytes
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+        return True
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        """Remover entrada explicitamente (não conta como evição)"""
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return False
+            expires_at = entry[2]
+            return expires_at is None or expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        """Cópia das entradas válidas (não altera a ordem LRU nem as estatísticas)"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value) for key, (value, _, expires_at) in self._entries.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def clear(self):
+        """Esvaziar o cache (estatísticas são mantidas)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """Remover todas as entradas expiradas. Retorna quantas foram removidas."""
+        now = time.monotonic()
+        removed = 0
+        with self._lock:
+            for key in [k for k, (_, _, exp) in self._entries.items() if exp is not None and exp <= now]:
+                _, size, _ = self._entries.pop(key)
+                self._bytes -= size
+                removed += 1
+            self._stats["expirations"] += removed
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do namespace"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["max_bytes"] = self.max_bytes
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+class PartitionedCache:
+    """
+    Cache LRU + TTL com orçamento global e cota por partição.
+    Cota estourada: evição LRU dentro da própria partição; orçamento global
+    estourado: evição LRU global. Partições vazias são descartadas.
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        max_entries: int = 100000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        partition_max_entries: Optional[int] = None,
+        partition_max_bytes: Optional[int] = None
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.partition_max_entries = partition_max_entries
+        self.partition_max_bytes = partition_max_bytes
+
+        # (partição, key) -> (value, size, expires_at), em ordem LRU global
+        self._entries: "OrderedDict[Tuple[Any, Any], Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        # partição -> keys em ordem LRU + bytes da partição
+        self._partitions: Dict[Any, "OrderedDict[Any, None]"] = {}
+        self._partition_bytes: Dict[Any, int] = {}
+        self._partition_evictions: Dict[Any, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "quota_evictions": 0,
+            "expirations": 0,
+            "puts": 0
+        }
+
+    def _remove(self, partition: Any, key: Any) -> Tuple[Any, int, Optional[float]]:
+        entry = self._entries.pop((partition, key))
+        self._bytes -= entry[1]
+        keys = self._partitions[partition]
+        del keys[key]
+        if keys:
+            self._partition_bytes[partition] -= entry[1]
+        else:
+            del self._partitions[partition]
+            del self._partition_bytes[partition]
+            self._partition_evictions.pop(partition, None)
+        return entry
+
+    def get(self, partition: Any, key: Any, default: Any = None) -> Any:
+        """Buscar valor (atualiza ordem LRU global e da partição)"""
+        with self._lock:
+            entry = self._entries.get((partition, key), _MISSING)
+            if entry is _MISSING:
+                self._stats["misses"] += 1
+                return default
+
+            value, _, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(partition, key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+
+            self._entries.move_to_end((partition, key))
+            self._partitions[partition].move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, partition: Any, key: Any, value: Any, size: Optional[int] = None,
+            ttl_seconds: Optional[float] = None) -> bool:
+        """Armazenar valor. Retorna False se o valor sozinho excede a cota ou o orçamento."""
+        if size is None:
+            size = estimate_size(value)
+        for limit in (self.max_bytes, self.partition_max_bytes):
+            if limit is not None and size > limit:
+                return False
+
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            if (partition, key) in self._entries:
+                self._remove(partition, key)
+
+            self._entries[(partition, key)] = (value, size, expires_at)
+            self._partitions.setdefault(partition, OrderedDict())[key] = None
+            self._partition_bytes[partition] = self._partition_bytes.get(partition, 0) + size
+            self._bytes += size
+            self._stats["puts"] += 1
+
+            # Cota da partição: evição LRU dentro da própria partição
+            keys = self._partitions[partition]
+            while len(keys) > 1 and (
+                (self.partition_max_entries is not None and len(keys) > self.partition_max_entries)
+                or (self.partition_max_bytes is not None and self._partition_bytes[partition] > self.partition_max_bytes)
+            ):
+                self._remove(partition, next(iter(keys)))
+                self._stats["quota_evictions"] += 1
+                self._partition_evictions[partition] = self._partition_evictions.get(partition, 0) + 1
+
+            # Orçamento global: evição LRU global
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                evicted_partition, evicted_key = next(iter(self._entries))
+                self._remove(evicted_partition, evicted_key)
+                self._stats["evictions"] += 1
+        return True
+
+    def pop(self, partition: Any, key: Any, default: Any = None) -> Any:
+        """Remover entrada explicitamente (não conta como evição)"""
+        with self._lock:
+            if (partition, key) not in self._entries:
+                return default
+            return self._remove(partition, key)[0]
+
+    def __contains__(self, partition_key: Tuple[Any, Any]) -> bool:
+        with self._lock:
+            entry = self._entries.get(partition_key, _MISSING)
+            if entry is _MISSING:
+                return False
+            expires_at = entry[2]
+            return expires_at is None or expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def partition_size(self, partition: Any) -> int:
+        keys = self._partitions.get(partition)
+        return len(keys) if keys is not None else 0
+
+    def clear(self):
+        """Esvaziar o cache (estatísticas são mantidas)"""
+        with self._lock:
+            self._entries.clear()
+            self._partitions.clear()
+            self._partition_bytes.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """Remover todas as entradas expiradas. Retorna quantas foram removidas."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [pk for pk, (_, _, exp) in self._entries.items() if exp is not None and exp <= now]
+            for partition, key in expired:
+                self._remove(partition, key)
+            self._stats["expirations"] += len(expired)
+        return len(expired)
+
+    def get_stats(self, top_partitions: int = 20) -> Dict[str, Any]:
+        """Estatísticas globais + as maiores partições (entradas, bytes, evições por cota)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["partition_count"] = len(self._partitions)
+            largest = sorted(self._partitions.items(), key=lambda item: len(item[1]), reverse=True)[:top_partitions]
+            stats["partitions"] = {
+                str(partition): {
+                    "entries": len(keys),
+                    "bytes": self._partition_bytes[partition],
+                    "quota_evictions": self._partition_evictions.get(partition, 0)
+                }
+                for partition, keys in largest
+            }
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["max_bytes"] = self.max_bytes
+        stats["ttl_seconds"] = self.ttl_seconds
+        stats["partition_max_entries"] = self.partition_max_entries
+        stats["partition_max_bytes"] = self.partition_max_bytes
+        return stats
+
+
+class PQCCacheManager:
+    """Registro de namespaces de cache com estatísticas consolidadas"""
+
+    def __init__(self):
+        self._namespaces: Dict[str, BoundedCache] = {}
+        self._lock = threading.Lock()
+
+    def namespace(
+        self,
+        name: str,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ) -> BoundedCache:
+        """Obter (ou criar) um namespace de cache"""
+        with self._lock:
+            cache = self._namespaces.get(name)
+            if cache is None:
+                cache = BoundedCache(name, max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+                self._namespaces[name] = cache
+            return cache
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas por namespace + totais"""
+        namespaces = {name: cache.get_stats() for name, cache in list(self._namespaces.items())}
+        totals = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "entries": 0, "bytes": 0}
+        for stats in namespaces.values():
+            for key in totals:
+                totals[key] += stats[key]
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_ratio"] = totals["hits"] / lookups if lookups else 0.0
+        return {"namespaces": namespaces, "totals": totals}
+
+    def clear(self):
+        for cache in list(self._namespaces.values()):
+            cache.clear()
@@ -0,0 +1,197 @@
+# pqc_falcon.py
+# 🦅 CAMINHO RÁPIDO FALCON (CONTEXTOS REUTILIZÁVEIS + LOTES + FORMATO BINÁRIO)
+"""
+Engine específico para FALCON, usado em caminhos de alto volume onde o
+tamanho da assinatura importa.
+
+- Contextos de assinatura em cache por chave: oqs.Signature com a chave
+  secreta (por thread - objetos liboqs não são thread-safe) ou KeyHandle
+  simulado do registro de signers
+- Assinatura/verificação em lote: uma resolução de chave por lote
+- Formato binário para lotes (assinaturas FALCON têm tamanho variável):
+
+    cabeçalho : magic "FB" | versão u8 | variante u8 | quantidade u32
+    registro  : len(assinatura) u16 | assinatura bruta
+"""
+
+import hmac
+import base64
+import struct
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from pqc_cache import BoundedCache
+from pqc_prehash import MessageDigest
+
+MAGIC = b"FB"
+VERSION = 1
+
+VARIANT_IDS = {"FALCON-512": 1, "FALCON-1024": 2}
+VARIANT_NAMES = {value: name for name, value in VARIANT_IDS.items()}
+# Nome liboqs de cada variante
+OQS_ALGORITHMS = {"FALCON-512": "Falcon-512", "FALCON-1024": "Falcon-1024"}
+
+_HEADER = struct.Struct(">2sBBI")
+_SIG_LEN = struct.Struct(">H")
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+# =============================================================================
+# FORMATO BINÁRIO DE LOTE
+# =============================================================================
+
+def encode_signature_batch(signatures: Sequence[BytesLike], variant: str = "FALCON-512") -> bytes:
+    """Serializar assinaturas FALCON brutas (prefixo de tamanho u16)"""
+    parts = [_HEADER.pack(MAGIC, VERSION, VARIANT_IDS.get(variant, 0), len(signatures))]
+    for signature in signatures:
+        if len(signature) > 0xFFFF:
+            raise ValueError("Assinatura FALCON muito longa")
+        parts.append(_SIG_LEN.pack(len(signature)))
+        parts.append(signature)
+    return b"".join(parts)
+
+
+def iter_signature_batch(buffer: BytesLike) -> Tuple[Optional[str], Iterator[memoryview]]:
+    """Variante e iterador de assinaturas (fatias memoryview, sem cópia)"""
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise ValueError("Lote FALCON truncado (cabeçalho)")
+    magic, version, variant_id, count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Magic inválido: não é um lote FALCON")
+    if version != VERSION:
+        raise ValueError(f"Versão de lote FALCON não suportada: {version}")
+
+    def signatures():
+        offset = _HEADER.size
+        for _ in range(count):
+            if offset + _SIG_LEN.size > len(view):
+                raise ValueError("Lote FALCON truncado")
+            size, = _SIG_LEN.unpack_from(view, offset)
+            offset += _SIG_LEN.size
+            if offset + size > len(view):
+                raise ValueError("Lote FALCON truncado")
+            yield view[offset:offset + size]
+            offset += size
+        if offset != len(view):
+            raise ValueError("Bytes extras após a última assinatura")
+
+    return VARIANT_NAMES.get(variant_id), signatures()
+
+
+def decode_signature_batch(buffer: BytesLike) -> Tuple[Optional[str], List[memoryview]]:
+    variant, signatures = iter_signature_batch(buffer)
+    return variant, list(signatures)
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+class FalconEngine:
+    """Assinatura/verificação FALCON com contextos em cache por chave"""
+
+    def __init__(
+        self,
+        signers,
+        backends,
+        secret_key_loader: Callable[[str, Dict], Optional[Tuple[str, bytes]]],
+        max_contexts: int = 1000
+    ):
+        self._signers = signers
+        self._backends = backends
+        self._secret_key_loader = secret_key_loader
+        self.max_contexts = max_contexts
+        self._local = threading.local()
+        self._epochs: Dict[str, int] = {}
+        self._stats = {"signed": 0, "verified": 0, "context_loads": 0, "signature_bytes": 0}
+        self._lock = threading.Lock()  # épocas e estatísticas (chamadores concorrentes)
+
+    @staticmethod
+    def oqs_algorithm(keypair: Dict) -> str:
+        variant = keypair.get("variant", "FALCON-512")
+        return keypair.get("oqs_algorithm") or OQS_ALGORITHMS.get(variant, variant)
+
+    @staticmethod
+    def is_real(keypair: Dict) -> bool:
+        return keypair.get("implementation") == "real"
+
+    def _contexts(self) -> BoundedCache:
+        contexts = getattr(self._local, "contexts", None)
+        if contexts is None:
+            contexts = self._local.contexts = BoundedCache("falcon_contexts", max_entries=self.max_contexts)
+        return contexts
+
+    def _real_context(self, keypair_id: str, keypair: Dict):
+        """oqs.Signature com a chave secreta carregada (cache por thread)"""
+        contexts = self._contexts()
+        epoch = self._epochs.get(keypair_id, 0)
+        cached = contexts.get(keypair_id)
+        if cached is not None and cached[0] == epoch:
+            return cached[1]
+        material = self._secret_key_loader(keypair_id, keypair)
+        if material is None:
+            return None
+        import oqs
+        context = oqs.Signature(material[0], material[1])
+        contexts.put(keypair_id, (epoch, context))
+        self._count(context_loads=1)
+        return context
+
+    def _count(self, **increments: int):
+        with self._lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    def invalidate(self, keypair_id: str):
+        """
+        Descartar contextos do keypair em todas as threads (rotação; chamado
+        por QuantumSecuritySystem.invalidate_precomputed_signatures)
+        """
+        with self._lock:
+            self._epochs[keypair_id] = self._epochs.get(keypair_id, 0) + 1
+        self._signers.invalidate(keypair_id)
+
+    def sign_many(self, keypair_id: str, keypair: Dict, messages: Sequence[MessageDigest]) -> Optional[List[bytes]]:
+        """Assinaturas brutas (None se o contexto REAL não puder ser carregado)"""
+        if self.is_real(keypair):
+            context = self._real_context(keypair_id, keypair)
+            if context is None:
+                return None
+            signatures = [bytes(context.sign(message.signing_payload())) for message in messages]
+        else:
+            signer = self._signers.get("FALCON")
+            handle = self._signers.handle("FALCON", keypair_id, keypair)
+            signatures = signer.sign_digests_batch(handle, [message.digest() for message in messages])
+        self._count(signed=len(signatures), signature_bytes=sum(len(signature) for signature in signatures))
+        return signatures
+
+    def verify_many(
+        self,
+        keypair_id: str,
+        keypair: Dict,
+        messages: Sequence[MessageDigest],
+        signatures: Sequence[BytesLike]
+    ) -> List[bool]:
+        results = []
+        if self.is_real(keypair):
+            algorithm = self.oqs_algorithm(keypair)
+            public_key = base64.b64decode(keypair["public_key"])
+            for message, signature in zip(messages, signatures):
+                try:
+                    results.append(self._backends.verify(algorithm, message.signing_payload(), bytes(signature), public_key))
+                except Exception:
+                    results.append(False)
+        else:
+            handle = self._signers.handle("FALCON", keypair_id, keypair)
+            for message, signature in zip(messages, signatures):
+                results.append(hmac.compare_digest(handle.sign_digest(message.digest()), bytes(signature)))
+        self._count(verified=len(results))
+        return results
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_signature_bytes"] = stats["signature_bytes"] / stats["signed"] if stats["signed"] else 0.0
+        return stats
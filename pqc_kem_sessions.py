@@ -0,0 +1,209 @@
+# pqc_kem_sessions.py
+# 🔑 SESSÕES ML-KEM: ENCAPSULAMENTO ÚNICO POR (DESTINATÁRIO, ÉPOCA) + AEAD
+"""
+Camada de sessão para criptografia híbrida com ML-KEM.
+
+- Um encapsulamento KEM por (destinatário, época); o segredo compartilhado
+  passa por HKDF-Extract uma única vez (PRK da sessão)
+- Chave por mensagem: HKDF-Expand(PRK, session_id || seq) - um bloco
+  HMAC-SHA256 (RFC 5869), sem novo encapsulamento
+- Payload com ChaCha20-Poly1305 ou AES-256-GCM; nonce = seq (único por
+  chave) e o cabeçalho da sessão entra como AAD
+- Sessões em cache limitado (LRU); rekey por número de mensagens ou idade
+  (nova época = novo encapsulamento)
+- Lado receptor: decapsulamento em cache por (keypair, session_id)
+"""
+
+import hmac
+import time
+import struct
+import hashlib
+import secrets
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305, AESGCM
+
+from pqc_cache import BoundedCache
+
+AEAD_ALGORITHMS = {"chacha20poly1305": ChaCha20Poly1305, "aes-256-gcm": AESGCM}
+
+_SALT = b"allianza-ml-kem-session-v1"
+_SEQ = struct.Struct(">Q")
+
+
+def derive_session_prk(shared_secret: bytes, session_id: bytes) -> bytes:
+    """HKDF-Extract do segredo KEM (uma vez por sessão)"""
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=_SALT, info=session_id)
+    # derive() = Extract + Expand; o resultado serve de PRK para as chaves por mensagem
+    return hkdf.derive(shared_secret)
+
+
+def derive_message_key(prk: bytes, session_id: bytes, seq: int) -> bytes:
+    """HKDF-Expand de um bloco: HMAC-SHA256(PRK, session_id || seq || 0x01)"""
+    return hmac.new(prk, session_id + _SEQ.pack(seq) + b"\x01", hashlib.sha256).digest()
+
+
+def message_nonce(seq: int) -> bytes:
+    return b"\x00\x00\x00\x00" + _SEQ.pack(seq)
+
+
+def session_aad(session_id: bytes, epoch: int, aad: Optional[bytes]) -> bytes:
+    return session_id + _SEQ.pack(epoch) + (aad or b"")
+
+
+class KEMSession:
+    """Sessão de envio: segredo encapsulado uma vez, chaves por mensagem via HKDF"""
+
+    __slots__ = ("recipient_id", "session_id", "epoch", "encapsulated_key", "aead", "_prk",
+                 "_next_seq", "created_at", "_lock")
+
+    def __init__(self, recipient_id: str, epoch: int, shared_secret: bytes, encapsulated_key: bytes, aead: str):
+        self.recipient_id = recipient_id
+        self.session_id = secrets.token_bytes(16)
+        self.epoch = epoch
+        self.encapsulated_key = encapsulated_key
+        self.aead = aead
+        self._prk = derive_session_prk(shared_secret, self.session_id)
+        self._next_seq = 0
+        self.created_at = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def messages(self) -> int:
+        return self._next_seq
+
+    def reserve(self) -> int:
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            return seq
+
+    def encrypt(self, plaintext: bytes, aad: Optional[bytes] = None) -> Tuple[int, bytes]:
+        seq = self.reserve()
+        cipher = AEAD_ALGORITHMS[self.aead](derive_message_key(self._prk, self.session_id, seq))
+        return seq, cipher.encrypt(message_nonce(seq), plaintext, session_aad(self.session_id, self.epoch, aad))
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id.hex(),
+            "epoch": self.epoch,
+            "encapsulated_key": self.encapsulated_key,
+            "aead": self.aead,
+            "kdf": "HKDF-SHA256"
+        }
+
+
+class KEMSessionCache:
+    """Sessões por destinatário (cache limitado) com política de rekey"""
+
+    def __init__(
+        self,
+        encapsulate: Callable[[str], Tuple[bytes, bytes]],
+        decapsulate: Optional[Callable[[str, bytes], bytes]] = None,
+        max_sessions: int = 1024,
+        rekey_after_messages: int = 1 << 20,
+        rekey_after_seconds: float = 3600.0,
+        aead: str = "chacha20poly1305"
+    ):
+        if aead not in AEAD_ALGORITHMS:
+            raise ValueError(f"AEAD não suportado: {aead}")
+        self._encapsulate = encapsulate
+        self._decapsulate = decapsulate
+        self.rekey_after_messages = rekey_after_messages
+        self.rekey_after_seconds = rekey_after_seconds
+        self.aead = aead
+        self._sessions = BoundedCache("kem_sessions", max_entries=max_sessions)
+        self._receive_prks = BoundedCache("kem_receive_sessions", max_entries=max_sessions)
+        self._epochs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"encapsulations": 0, "rekeys": 0, "messages_encrypted": 0,
+                       "decapsulations": 0, "messages_decrypted": 0}
+
+    def _expired(self, session: KEMSession) -> bool:
+        return (session.messages >= self.rekey_after_messages or
+                time.time() - session.created_at >= self.rekey_after_seconds)
+
+    def session(self, recipient_id: str) -> KEMSession:
+        """Sessão ativa do destinatário (encapsula na primeira vez e a cada rekey)"""
+        session = self._sessions.get(recipient_id)
+        if session is not None and not self._expired(session):
+            return session
+        with self._lock:
+            session = self._sessions.get(recipient_id)
+            if session is not None and not self._expired(session):
+                return session
+            if session is not None:
+                self._stats["rekeys"] += 1
+            epoch = self._epochs.get(recipient_id, -1) + 1
+            self._epochs[recipient_id] = epoch
+            shared_secret, encapsulated_key = self._encapsulate(recipient_id)
+            self._stats["encapsulations"] += 1
+            session = KEMSession(recipient_id, epoch, shared_secret, encapsulated_key, self.aead)
+            self._sessions.put(recipient_id, session, size=256)
+            return session
+
+    def encrypt(self, recipient_id: str, plaintext: bytes, aad: Optional[bytes] = None) -> Tuple[KEMSession, int, bytes]:
+        session = self.session(recipient_id)
+        seq, ciphertext = session.encrypt(plaintext, aad)
+        self._stats["messages_encrypted"] += 1
+        return session, seq, ciphertext
+
+    def encrypt_many(self, recipient_id: str, plaintexts, aad: Optional[bytes] = None):
+        """Lote para o mesmo destinatário: sessão resolvida uma vez (e a cada rekey)"""
+        results = []
+        session = self.session(recipient_id)
+        for plaintext in plaintexts:
+            if session.messages >= self.rekey_after_messages:
+                session = self.session(recipient_id)
+            seq, ciphertext = session.encrypt(plaintext, aad)
+            results.append((session, seq, ciphertext))
+        self._stats["messages_encrypted"] += len(results)
+        return results
+
+    def rekey(self, recipient_id: str):
+        """Forçar nova época no próximo envio"""
+        self._sessions.pop(recipient_id)
+
+    def decrypt(
+        self,
+        keypair_id: str,
+        session_id: bytes,
+        epoch: int,
+        encapsulated_key: bytes,
+        aead: str,
+        seq: int,
+        ciphertext: bytes,
+        aad: Optional[bytes] = None
+    ) -> bytes:
+        """Lado receptor: decapsula uma vez por sessão e decifra a mensagem `seq`"""
+        if self._decapsulate is None:
+            raise ValueError("Decapsulamento não configurado")
+        # O encapsulamento entra na chave: uma mensagem forjada com session_id
+        # conhecido e encapsulated_key falso não substitui o PRK legítimo
+        cache_key = (keypair_id, session_id, hashlib.sha256(encapsulated_key).digest())
+        prk = self._receive_prks.get(cache_key)
+        cached = prk is not None
+        if not cached:
+            prk = derive_session_prk(self._decapsulate(keypair_id, encapsulated_key), session_id)
+            self._stats["decapsulations"] += 1
+        cipher = AEAD_ALGORITHMS[aead](derive_message_key(prk, session_id, seq))
+        plaintext = cipher.decrypt(message_nonce(seq), ciphertext, session_aad(session_id, epoch, aad))
+        if not cached:
+            # Só guardar o PRK depois que a tag AEAD foi validada
+            self._receive_prks.put(cache_key, prk, size=64)
+        self._stats["messages_decrypted"] += 1
+        return plaintext
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["active_sessions"] = len(self._sessions)
+        stats["messages_per_encapsulation"] = (
+            stats["messages_encrypted"] / stats["encapsulations"] if stats["encapsulations"] else 0.0
+        )
+        stats["aead"] = self.aead
+        stats["rekey_after_messages"] = self.rekey_after_messages
+        stats["rekey_after_seconds"] = self.rekey_after_seconds
+        return stats
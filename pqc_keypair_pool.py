@@ -0,0 +1,181 @@
+# pqc_keypair_pool.py
+# 🏊 POOL DE KEYPAIRS PRÉ-GERADOS EM BACKGROUND (QRS-3, ML-DSA, SPHINCS+)
+"""
+Pool opt-in de keypairs prontos para uso.
+
+- Workers em background mantêm `target_depth` keypairs por tipo/variante
+- `take()` é O(1) (deque.popleft); miss retorna None e o chamador gera inline
+- Reposição assíncrona sinalizada a cada retirada
+- Alerta de low-watermark (log + callback opcional)
+- Métricas: profundidade, hits/misses, taxa de acerto, erros de geração
+"""
+
+import time
+import math
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolLane:
+    __slots__ = ("kind", "generator", "target_depth", "low_watermark", "items", "hits", "misses",
+                 "generated", "errors", "alerts", "alerted", "generation_ms_total", "lock")
+
+    def __init__(self, kind: str, generator: Callable[[], Dict], target_depth: int, low_watermark: int):
+        self.kind = kind
+        self.generator = generator
+        self.target_depth = target_depth
+        self.low_watermark = low_watermark
+        self.items = deque()
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.errors = 0
+        self.alerts = 0
+        self.alerted = False
+        self.generation_ms_total = 0.0
+        # Contadores e flag de alerta são atualizados por chamadores e workers de reposição
+        self.lock = threading.Lock()
+
+
+class KeypairPool:
+    """Pool de keypairs pré-gerados com reposição em background"""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        low_watermark_ratio: float = 0.25,
+        on_low_watermark: Optional[Callable[[str, int], None]] = None,
+        name: str = "keypair-pool"
+    ):
+        self.workers = max(1, workers)
+        self.low_watermark_ratio = low_watermark_ratio
+        self.on_low_watermark = on_low_watermark
+        self.name = name
+
+        self._lanes: Dict[str, _PoolLane] = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopped = False
+
+    def register(self, kind: str, generator: Callable[[], Dict], target_depth: int = 16):
+        """Registrar tipo de keypair (ex: "qrs3", "ml_dsa:3", "sphincs:sha256-128f")"""
+        low_watermark = max(1, math.ceil(target_depth * self.low_watermark_ratio))
+        with self._cond:
+            self._lanes[kind] = _PoolLane(kind, generator, target_depth, low_watermark)
+            self._cond.notify_all()
+
+    def start(self):
+        """Iniciar workers de reposição (daemon)"""
+        with self._cond:
+            if self._threads:
+                return
+            self._stopped = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._refill_loop, name=f"{self.name}-{i}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def take(self, kind: str) -> Optional[Dict]:
+        """Retirar keypair pronto (O(1)). None em caso de miss."""
+        lane = self._lanes.get(kind)
+        if lane is None:
+            return None
+        with lane.lock:
+            try:
+                keypair = lane.items.popleft()
+            except IndexError:
+                lane.misses += 1
+                keypair = None
+            else:
+                lane.hits += 1
+            depth = len(lane.items)
+            alert = depth <= lane.low_watermark and not lane.alerted
+            if alert:
+                lane.alerted = True
+                lane.alerts += 1
+
+        if alert:
+            logger.warning(f"⚠️  Pool de keypairs '{kind}' abaixo do low-watermark: {depth}/{lane.target_depth}")
+            if self.on_low_watermark:
+                try:
+                    self.on_low_watermark(kind, depth)
+                except Exception:
+                    logger.exception("Callback de low-watermark falhou")
+
+        with self._cond:
+            self._cond.notify()
+        return keypair
+
+    def _next_lane(self) -> Optional[_PoolLane]:
+        """Tipo com maior déficit relativo (None se todos cheios)"""
+        best, best_deficit = None, 0.0
+        for lane in self._lanes.values():
+            deficit = (lane.target_depth - len(lane.items)) / lane.target_depth if lane.target_depth else 0.0
+            if deficit > best_deficit:
+                best, best_deficit = lane, deficit
+        return best
+
+    def _refill_loop(self):
+        while True:
+            with self._cond:
+                lane = None
+                while not self._stopped:
+                    lane = self._next_lane()
+                    if lane is not None:
+                        break
+                    self._cond.wait(timeout=1.0)
+                if self._stopped:
+                    return
+
+            start = time.perf_counter()
+            try:
+                keypair = lane.generator()
+            except Exception as e:
+                keypair = {"success": False, "error": str(e)}
+            if keypair and keypair.get("success"):
+                with lane.lock:
+                    lane.generation_ms_total += (time.perf_counter() - start) * 1000
+                    lane.generated += 1
+                    lane.items.append(keypair)
+                    if len(lane.items) > lane.low_watermark:
+                        lane.alerted = False
+            else:
+                with lane.lock:
+                    lane.errors += 1
+                logger.warning(f"⚠️  Falha ao pré-gerar keypair '{lane.kind}': {keypair.get('error') if keypair else 'vazio'}")
+                with self._cond:
+                    self._cond.wait(timeout=0.5)  # backoff
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidade e taxa de acerto por tipo"""
+        lanes = {}
+        for kind, lane in list(self._lanes.items()):
+            with lane.lock:
+                lookups = lane.hits + lane.misses
+                lanes[kind] = {
+                    "depth": len(lane.items),
+                    "target_depth": lane.target_depth,
+                    "low_watermark": lane.low_watermark,
+                    "hits": lane.hits,
+                    "misses": lane.misses,
+                    "hit_rate": lane.hits / lookups if lookups else 0.0,
+                    "generated": lane.generated,
+                    "errors": lane.errors,
+                    "low_watermark_alerts": lane.alerts,
+                    "avg_generation_ms": lane.generation_ms_total / lane.generated if lane.generated else 0.0
+                }
+        return {"running": bool(self._threads) and not self._stopped, "workers": self.workers, "lanes": lanes}
+
+    def stop(self, wait: bool = True):
+        """Parar workers de reposição"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        if wait:
+            for thread in threads:
+                thread.join(timeout=5)
@@ -0,0 +1,546 @@
+# pqc_keystore.py
+# 🔑 KEYSTORE PQC PERSISTENTE COM CARREGAMENTO LAZY
+"""
+Armazenamento persistente para QuantumSecuritySystem.pqc_keypairs.
+
+- Backends plugáveis: memória, SQLite e arquivo append-only com índice
+- Registros binários compactos: material de chave em bytes crus
+  (base64 -> bytes, PEM -> DER), strings/ints/bools tipados
+- Decodificação lazy: o registro só é interpretado campo a campo no primeiro acesso
+- Working set limitado em memória (LRU) na frente do backend
+- Listagem paginada sem materializar o store inteiro
+
+Campos que começam com "_" são transientes (caches de objetos carregados)
+e não são persistidos, exceto os listados em PERSISTED_PRIVATE_FIELDS.
+Arquivos do keystore são criados com permissão 0o600 (contêm chaves privadas).
+"""
+
+import os
+import json
+import base64
+import bisect
+import struct
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pqc_cache import BoundedCache
+
+RECORD_VERSION = 1
+
+# Tipos de campo do registro binário
+_T_NONE = 0
+_T_STR = 1
+_T_INT = 2
+_T_BOOL = 3
+_T_B64 = 4  # bytes crus, expostos como string base64
+_T_PEM_PRIVATE = 5  # DER, exposto como PEM "PRIVATE KEY"
+_T_PEM_PUBLIC = 6  # DER, exposto como PEM "PUBLIC KEY"
+_T_JSON = 7
+
+_PEM_LABELS = {_T_PEM_PRIVATE: "PRIVATE KEY", _T_PEM_PUBLIC: "PUBLIC KEY"}
+
+# Keypairs REAIS: handle + chave secreta exportada (o backend liboqs não sobrevive a reinícios)
+PERSISTED_PRIVATE_FIELDS = ("_real_keypair_id", "_backend_handle", "_real_secret_key", "_real_oqs_algorithm")
+# Textos de apresentação das respostas da API - não precisam ser persistidos
+DISPLAY_FIELDS = ("message", "world_first", "note", "warning", "benefits", "security_guarantee")
+
+_HEADER = struct.Struct(">BH")  # versão, número de campos
+_FIELD = struct.Struct(">BB")  # tipo, tamanho do nome
+_LEN = struct.Struct(">I")
+
+
+def _der_to_pem(der: bytes, label: str) -> str:
+    body = base64.b64encode(der).decode()
+    lines = [body[i:i + 64] for i in range(0, len(body), 64)]
+    return f"-----BEGIN {label}-----\n" + "\n".join(lines) + f"\n-----END {label}-----\n"
+
+
+def _encode_value(value: Any) -> Tuple[int, bytes]:
+    """Escolher a representação binária mais compacta que faz round-trip exato"""
+    if value is None:
+        return _T_NONE, b""
+    if isinstance(value, bool):
+        return _T_BOOL, b"\x01" if value else b"\x00"
+    if isinstance(value, int) and -(2 ** 63) <= value < 2 ** 63:
+        return _T_INT, struct.pack(">q", value)
+    if isinstance(value, str):
+        for field_type, label in _PEM_LABELS.items():
+            if value.startswith(f"-----BEGIN {label}-----"):
+                try:
+                    der = base64.b64decode("".join(value.strip().splitlines()[1:-1]))
+                    if _der_to_pem(der, label) == value:
+                        return field_type, der
+                except Exception:
+                    pass
+        if len(value) >= 16 and len(value) % 4 == 0:
+            try:
+                raw = base64.b64decode(value, validate=True)
+                if base64.b64encode(raw).decode() == value:
+                    return _T_B64, raw
+            except Exception:
+                pass
+        return _T_STR, value.encode()
+    return _T_JSON, json.dumps(value, separators=(",", ":")).encode()
+
+
+def _decode_value(field_type: int, raw: memoryview) -> Any:
+    if field_type == _T_NONE:
+        return None
+    if field_type == _T_BOOL:
+        return raw[0] == 1
+    if field_type == _T_INT:
+        return struct.unpack(">q", raw)[0]
+    if field_type == _T_STR:
+        return bytes(raw).decode()
+    if field_type == _T_B64:
+        return base64.b64encode(raw).decode()
+    if field_type in _PEM_LABELS:
+        return _der_to_pem(bytes(raw), _PEM_LABELS[field_type])
+    return json.loads(bytes(raw))
+
+
+def encode_record(keypair: Dict[str, Any]) -> bytes:
+    """Serializar keypair em registro binário compacto (campos transientes são omitidos)"""
+    parts = []
+    count = 0
+    for name, value in keypair.items():
+        if name in DISPLAY_FIELDS:
+            continue
+        if name.startswith("_") and name not in PERSISTED_PRIVATE_FIELDS:
+            continue
+        try:
+            field_type, payload = _encode_value(value)
+        except (TypeError, ValueError):
+            continue  # objetos não serializáveis não são persistidos
+        name_bytes = name.encode()
+        parts.append(_FIELD.pack(field_type, len(name_bytes)))
+        parts.append(name_bytes)
+        parts.append(_LEN.pack(len(payload)))
+        parts.append(payload)
+        count += 1
+    return _HEADER.pack(RECORD_VERSION, count) + b"".join(parts)
+
+
+class LazyKeypairRecord(MutableMapping):
+    """
+    Keypair decodificado sob demanda a partir do registro binário.
+    Apenas o diretório de campos (offsets) é lido na construção.
+    """
+
+    __slots__ = ("_raw", "_fields", "_decoded")
+
+    def __init__(self, record: bytes):
+        self._raw = memoryview(record)
+        self._fields: Dict[str, Tuple[int, int, int]] = {}
+        self._decoded: Dict[str, Any] = {}
+
+        version, count = _HEADER.unpack_from(self._raw, 0)
+        if version != RECORD_VERSION:
+            raise ValueError(f"Versão de registro não suportada: {version}")
+        offset = _HEADER.size
+        for _ in range(count):
+            field_type, name_len = _FIELD.unpack_from(self._raw, offset)
+            offset += _FIELD.size
+            name = bytes(self._raw[offset:offset + name_len]).decode()
+            offset += name_len
+            (value_len,) = _LEN.unpack_from(self._raw, offset)
+            offset += _LEN.size
+            self._fields[name] = (field_type, offset, offset + value_len)
+            offset += value_len
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._decoded:
+            return self._decoded[name]
+        field = self._fields.get(name)
+        if field is None:
+            raise KeyError(name)
+        field_type, start, end = field
+        value = _decode_value(field_type, self._raw[start:end])
+        self._decoded[name] = value
+        return value
+
+    def raw_bytes(self, name: str) -> Optional[bytes]:
+        """Acesso direto ao material de chave em bytes crus (sem base64/PEM)"""
+        field = self._fields.get(name)
+        if field is None:
+            return None
+        return bytes(self._raw[field[1]:field[2]])
+
+    def __setitem__(self, name: str, value: Any):
+        self._decoded[name] = value
+
+    def __delitem__(self, name: str):
+        found = self._fields.pop(name, None) is not None
+        found = self._decoded.pop(name, None) is not None or found
+        if not found:
+            raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._decoded or name in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        for name in self._decoded:
+            if name not in self._fields:
+                yield name
+
+    def __len__(self) -> int:
+        return len(self._fields) + sum(1 for name in self._decoded if name not in self._fields)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+def _create_private_file(path: str):
+    """Criar o arquivo do keystore legível só pelo dono (não altera arquivos existentes)"""
+    os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+
+
+def _record_meta(keypair: Dict[str, Any]) -> Tuple[str, str, bool]:
+    return (
+        str(keypair.get("algorithm", "Unknown")),
+        str(keypair.get("created_at") or ""),
+        bool(keypair.get("quantum_resistant", False))
+    )
+
+
+class _SortedIds:
+    """Ids em ordem para paginação por chave (cursor = último id da página)"""
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids=()):
+        self._ids: List[str] = sorted(ids)
+
+    def add(self, keypair_id: str):
+        i = bisect.bisect_left(self._ids, keypair_id)
+        if i == len(self._ids) or self._ids[i] != keypair_id:
+            self._ids.insert(i, keypair_id)
+
+    def discard(self, keypair_id: str):
+        i = bisect.bisect_left(self._ids, keypair_id)
+        if i < len(self._ids) and self._ids[i] == keypair_id:
+            del self._ids[i]
+
+    def page(self, cursor: Optional[str], limit: int) -> Tuple[List[str], Optional[str]]:
+        # Cursor por chave: remoções concorrentes não deslocam as próximas páginas
+        start = bisect.bisect_right(self._ids, cursor) if cursor else 0
+        ids = self._ids[start:start + limit]
+        next_cursor = ids[-1] if ids and start + limit < len(self._ids) else None
+        return ids, next_cursor
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class MemoryKeyStoreBackend:
+    """Backend em memória (registros binários compactos, sem persistência)"""
+
+    durable = False
+
+    def __init__(self):
+        self._records: Dict[str, Tuple[bytes, Tuple[str, str, bool]]] = {}
+        self._ids = _SortedIds()
+        self._lock = threading.Lock()
+
+    def get(self, keypair_id: str) -> Optional[bytes]:
+        entry = self._records.get(keypair_id)
+        return entry[0] if entry else None
+
+    def put(self, keypair_id: str, record: bytes, meta: Tuple[str, str, bool]):
+        with self._lock:
+            self._records[keypair_id] = (record, meta)
+            self._ids.add(keypair_id)
+
+    def delete(self, keypair_id: str) -> bool:
+        with self._lock:
+            self._ids.discard(keypair_id)
+            return self._records.pop(keypair_id, None) is not None
+
+    def contains(self, keypair_id: str) -> bool:
+        return keypair_id in self._records
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def page(self, cursor: Optional[str], limit: int) -> Tuple[List[Tuple[str, str, str, bool]], Optional[str]]:
+        with self._lock:
+            ids, next_cursor = self._ids.page(cursor, limit)
+            rows = [(kp_id, *self._records[kp_id][1]) for kp_id in ids]
+        return rows, next_cursor
+
+    def close(self):
+        pass
+
+
+class SQLiteKeyStoreBackend:
+    """Backend SQLite (WAL): leitura por chave primária, paginação por rowid"""
+
+    durable = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # SQLite cria -wal/-shm com as permissões do arquivo principal
+        _create_private_file(path)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS keypairs ("
+            " keypair_id TEXT PRIMARY KEY,"
+            " algorithm TEXT,"
+            " created_at TEXT,"
+            " quantum_resistant INTEGER,"
+            " record BLOB NOT NULL)"
+        )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM keypairs").fetchone()[0]
+
+    def get(self, keypair_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM keypairs WHERE keypair_id = ?", (keypair_id,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, keypair_id: str, record: bytes, meta: Tuple[str, str, bool]):
+        algorithm, created_at, quantum_resistant = meta
+        with self._lock:
+            existed = self._conn.execute("SELECT 1 FROM keypairs WHERE keypair_id = ?", (keypair_id,)).fetchone()
+            # Upsert (não INSERT OR REPLACE): manter o rowid, que é o cursor da paginação
+            self._conn.execute(
+                "INSERT INTO keypairs (keypair_id, algorithm, created_at, quantum_resistant, record)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(keypair_id) DO UPDATE SET"
+                " algorithm = excluded.algorithm, created_at = excluded.created_at,"
+                " quantum_resistant = excluded.quantum_resistant, record = excluded.record",
+                (keypair_id, algorithm, created_at, int(quantum_resistant), sqlite3.Binary(record))
+            )
+            if not existed:
+                self._count += 1
+
+    def delete(self, keypair_id: str) -> bool:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM keypairs WHERE keypair_id = ?", (keypair_id,)).rowcount > 0
+            if deleted:
+                self._count -= 1
+        return deleted
+
+    def contains(self, keypair_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM keypairs WHERE keypair_id = ?", (keypair_id,)).fetchone() is not None
+
+    def count(self) -> int:
+        return self._count
+
+    def page(self, cursor: Optional[str], limit: int) -> Tuple[List[Tuple[str, str, str, bool]], Optional[str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, keypair_id, algorithm, created_at, quantum_resistant FROM keypairs"
+                " WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (int(cursor or 0), limit + 1)
+            ).fetchall()
+        next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return [(r[1], r[2], r[3], bool(r[4])) for r in rows[:limit]], next_cursor
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AppendOnlyFileKeyStoreBackend:
+    """
+    Backend em arquivo append-only.
+
+    Cada entrada: tamanho | operação (put/delete) | id | metadados | registro.
+    Na abertura apenas os cabeçalhos são lidos (seek sobre o registro) para
+    montar o índice id -> (offset, tamanho); o material de chave fica no disco.
+    """
+
+    _ENTRY = struct.Struct(">IB")  # tamanho do corpo, operação
+    _OP_PUT = 1
+    _OP_DELETE = 2
+
+    durable = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, int, Tuple[str, str, bool]]] = {}
+        _create_private_file(path)
+        self._file = open(path, "a+b")
+        self._rebuild_index()
+        self._ids = _SortedIds(self._index)
+
+    @staticmethod
+    def _pack_str(value: str) -> bytes:
+        data = value.encode()
+        return struct.pack(">H", len(data)) + data
+
+    def _read_str(self) -> str:
+        (length,) = struct.unpack(">H", self._file.read(2))
+        return self._file.read(length).decode()
+
+    def _rebuild_index(self):
+        self._file.seek(0, os.SEEK_END)
+        end = self._file.tell()
+        offset = 0
+        self._file.seek(0)
+        while offset + self._ENTRY.size <= end:
+            body_len, op = self._ENTRY.unpack(self._file.read(self._ENTRY.size))
+            body_start = offset + self._ENTRY.size
+            if body_start + body_len > end:
+                break  # entrada truncada (escrita interrompida) - ignorada
+            keypair_id = self._read_str()
+            if op == self._OP_PUT:
+                meta = (self._read_str(), self._read_str(), self._file.read(1) == b"\x01")
+                record_offset = self._file.tell()
+                self._index[keypair_id] = (record_offset, body_start + body_len - record_offset, meta)
+            else:
+                self._index.pop(keypair_id, None)
+            offset = body_start + body_len
+            self._file.seek(offset)
+
+    def get(self, keypair_id: str) -> Optional[bytes]:
+        entry = self._index.get(keypair_id)
+        if entry is None:
+            return None
+        with self._lock:
+            self._file.seek(entry[0])
+            return self._file.read(entry[1])
+
+    def _append(self, op: int, body: bytes) -> int:
+        self._file.seek(0, os.SEEK_END)
+        start = self._file.tell()
+        self._file.write(self._ENTRY.pack(len(body), op) + body)
+        self._file.flush()
+        return start + self._ENTRY.size
+
+    def put(self, keypair_id: str, record: bytes, meta: Tuple[str, str, bool]):
+        algorithm, created_at, quantum_resistant = meta
+        head = (
+            self._pack_str(keypair_id) + self._pack_str(algorithm) + self._pack_str(created_at)
+            + (b"\x01" if quantum_resistant else b"\x00")
+        )
+        with self._lock:
+            body_start = self._append(self._OP_PUT, head + record)
+            self._index[keypair_id] = (body_start + len(head), len(record), meta)
+            self._ids.add(keypair_id)
+
+    def delete(self, keypair_id: str) -> bool:
+        with self._lock:
+            if keypair_id not in self._index:
+                return False
+            self._append(self._OP_DELETE, self._pack_str(keypair_id))
+            del self._index[keypair_id]
+            self._ids.discard(keypair_id)
+            return True
+
+    def contains(self, keypair_id: str) -> bool:
+        return keypair_id in self._index
+
+    def count(self) -> int:
+        return len(self._index)
+
+    def page(self, cursor: Optional[str], limit: int) -> Tuple[List[Tuple[str, str, str, bool]], Optional[str]]:
+        with self._lock:
+            ids, next_cursor = self._ids.page(cursor, limit)
+            rows = [(kp_id, *self._index[kp_id][2]) for kp_id in ids]
+        return rows, next_cursor
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def open_keystore_backend(path: Optional[str]):
+    """Escolher backend pelo caminho: None -> memória, .db/.sqlite -> SQLite, outro -> append-only"""
+    if not path:
+        return MemoryKeyStoreBackend()
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        return SQLiteKeyStoreBackend(path)
+    return AppendOnlyFileKeyStoreBackend(path)
+
+
+# =============================================================================
+# KEYSTORE (interface de dicionário usada por QuantumSecuritySystem)
+# =============================================================================
+
+class PQCKeyStore(MutableMapping):
+    """
+    Substituto de `dict` para pqc_keypairs: write-through no backend,
+    working set LRU limitado em memória e leitura lazy dos registros.
+    """
+
+    def __init__(self, backend=None, working_set_size: int = 10000):
+        self.backend = backend or MemoryKeyStoreBackend()
+        self._working_set = BoundedCache("keystore_working_set", max_entries=working_set_size)
+        self._stats = {"loads": 0, "writes": 0}
+
+    def __getitem__(self, keypair_id: str):
+        keypair = self._working_set.get(keypair_id)
+        if keypair is not None:
+            return keypair
+
+        record = self.backend.get(keypair_id)
+        if record is None:
+            raise KeyError(keypair_id)
+        keypair = LazyKeypairRecord(record)
+        self._stats["loads"] += 1
+        self._working_set.put(keypair_id, keypair, size=len(record))
+        return keypair
+
+    def __setitem__(self, keypair_id: str, keypair: Dict[str, Any]):
+        if self.backend.durable and keypair.get("_backend_handle") and not keypair.get("_real_secret_key"):
+            # Só o handle seria gravado: após reinício a chave não conseguiria assinar
+            raise ValueError(f"Keypair REAL {keypair_id} sem chave secreta exportada não pode ser persistido")
+        record = encode_record(keypair)
+        self.backend.put(keypair_id, record, _record_meta(keypair))
+        self._stats["writes"] += 1
+        self._working_set.put(keypair_id, keypair, size=len(record))
+
+    def persist(self, keypair_id: str):
+        """Regravar um keypair já armazenado após mutação de campos persistentes"""
+        self[keypair_id] = self[keypair_id]
+
+    def __delitem__(self, keypair_id: str):
+        self._working_set.pop(keypair_id)
+        if not self.backend.delete(keypair_id):
+            raise KeyError(keypair_id)
+
+    def __contains__(self, keypair_id: object) -> bool:
+        if keypair_id in self._working_set:
+            return True
+        return isinstance(keypair_id, str) and self.backend.contains(keypair_id)
+
+    def __len__(self) -> int:
+        return self.backend.count()
+
+    def __iter__(self) -> Iterator[str]:
+        cursor = None
+        while True:
+            rows, cursor = self.backend.page(cursor, 1000)
+            for row in rows:
+                yield row[0]
+            if cursor is None:
+                return
+
+    def resident_items(self) -> List[Tuple[str, Any]]:
+        """Keypairs já carregados no working set (sem ler o backend)"""
+        return self._working_set.items()
+
+    def list_page(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Tuple[str, str, str, bool]], Optional[str]]:
+        """Página de metadados (id, algorithm, created_at, quantum_resistant) sem decodificar registros"""
+        return self.backend.page(cursor, limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "stored_keypairs": self.backend.count(),
+            "working_set": self._working_set.get_stats(),
+            **self._stats
+        }
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,326 @@
+# pqc_metrics.py
+# 📈 INSTRUMENTAÇÃO: HISTOGRAMAS DE LATÊNCIA (ESTILO HDR) + CONTADORES + PROMETHEUS
+"""
+Superfície de métricas do QuantumSecuritySystem.
+
+- Histogramas log-lineares estilo HDR (16 sub-buckets por oitava, erro
+  relativo <= ~6%) por (operação, algoritmo), em microssegundos
+- Contadores por (operação, algoritmo, status)
+- Tempo de espera na fila separado do tempo de execução (pools)
+- Amostragem opcional no caminho quente: 1 de cada N chamadas é
+  cronometrada e gravada com peso N (contagens estimadas, quantis da amostra)
+- Caminho quente sem lock: cada thread grava no seu próprio shard
+  (threading.local); snapshot/reset agregam os shards. Shards de threads
+  encerradas são incorporados a um agregado "aposentado" (weakref.finalize)
+- reset() troca de geração: cada thread descarta o próprio shard antigo na
+  próxima gravação (só a thread dona altera o shard)
+- Exportação em texto Prometheus (summary com quantis + counters/gauges)
+"""
+
+import time
+import weakref
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 40  # ~12 dias em µs
+_BUCKET_COUNT = (MAX_EXPONENT + 2) * SUB_BUCKETS
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def bucket_index(value_us: int) -> int:
+    """Índice log-linear O(1): exato abaixo de 32 µs, 16 sub-buckets por potência de 2"""
+    if value_us < 2 * SUB_BUCKETS:
+        return value_us if value_us > 0 else 0
+    shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    index = shift * SUB_BUCKETS + (value_us >> shift)
+    return index if index < _BUCKET_COUNT else _BUCKET_COUNT - 1
+
+
+def bucket_upper_bound(index: int) -> int:
+    """Maior valor (µs) que cai no bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index - shift * SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Histograma log-linear (µs) - contagens em lista, sem lock (um por shard)"""
+
+    __slots__ = ("counts", "count", "errors", "total_us", "max_us")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.errors = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, value_us: int, weight: int = 1):
+        # bucket_index() em linha: este é o caminho quente
+        if value_us < 2 * SUB_BUCKETS:
+            index = value_us if value_us > 0 else 0
+        else:
+            shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+            index = shift * SUB_BUCKETS + (value_us >> shift)
+            if index >= _BUCKET_COUNT:
+                index = _BUCKET_COUNT - 1
+        self.counts[index] += weight
+        self.count += weight
+        self.total_us += value_us * weight
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other: "LatencyHistogram"):
+        counts = self.counts
+        for i, n in enumerate(other.counts):
+            if n:
+                counts[i] += n
+        self.count += other.count
+        self.errors += other.errors
+        self.total_us += other.total_us
+        if other.max_us > self.max_us:
+            self.max_us = other.max_us
+
+    def quantile_us(self, q: float) -> int:
+        if not self.count:
+            return 0
+        target = max(1, int(q * self.count + 0.5))
+        running = 0
+        for i, n in enumerate(self.counts):
+            running += n
+            if running >= target:
+                return min(bucket_upper_bound(i), self.max_us)
+        return self.max_us
+
+    def summary(self) -> Dict[str, Any]:
+        summary = {
+            "count": self.count,
+            "sum_ms": self.total_us / 1000,
+            "avg_ms": self.total_us / self.count / 1000 if self.count else 0.0,
+            "max_ms": self.max_us / 1000
+        }
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}_ms"] = self.quantile_us(q) / 1000
+        return summary
+
+
+class _Shard:
+    """Métricas de uma thread (gravadas sem lock)"""
+
+    __slots__ = ("histograms", "generation")
+
+    def __init__(self, generation: int):
+        self.histograms: Dict[Tuple[str, ...], LatencyHistogram] = {}
+        self.generation = generation
+
+
+class _ShardOwner:
+    """Guardado no threading.local: coletado quando a thread termina"""
+
+    __slots__ = ("__weakref__",)
+
+
+def _retire_shard(registry_ref: "weakref.ref", shard: _Shard):
+    registry = registry_ref()
+    if registry is not None:
+        registry._retire(shard)
+
+
+def _merge_into(target: Dict[Tuple[str, ...], LatencyHistogram], source: Dict[Tuple[str, ...], LatencyHistogram]):
+    for key, histogram in source.items():
+        merged = target.get(key)
+        if merged is None:
+            merged = target[key] = LatencyHistogram()
+        merged.merge(histogram)
+
+
+class MetricsRegistry:
+    """Histogramas + contadores com shards por thread, snapshot/reset e export Prometheus"""
+
+    def __init__(self, namespace: str = "qss", enabled: bool = True):
+        self.namespace = namespace
+        self.enabled = enabled
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired: Dict[Tuple[str, ...], LatencyHistogram] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            with self._lock:
+                shard = _Shard(self._generation)
+                self._shards.append(shard)
+            owner = self._local.owner = _ShardOwner()
+            self._local.shard = shard
+            # Thread encerrada -> threading.local liberado -> shard aposentado
+            weakref.finalize(owner, _retire_shard, weakref.ref(self), shard)
+        elif shard.generation != self._generation:
+            # reset() desde a última gravação: descartar o shard antigo
+            shard.histograms = {}
+            shard.generation = self._generation
+        return shard
+
+    def _retire(self, shard: _Shard):
+        """Incorporar o shard de uma thread encerrada ao agregado aposentado"""
+        with self._lock:
+            try:
+                self._shards.remove(shard)
+            except ValueError:
+                return
+            if shard.generation == self._generation:
+                _merge_into(self._retired, shard.histograms)
+
+    # ------------------------------------------------------------------
+    # Caminho quente
+    # ------------------------------------------------------------------
+
+    def observe(self, operation: str, algorithm: str, seconds: float, success: bool = True):
+        """Registrar uma operação (latência + contador por status)"""
+        self.record((operation, algorithm), int(seconds * 1_000_000), success)
+
+    def record(self, key: Tuple[str, str], value_us: int, success: bool = True, weight: int = 1):
+        """
+        observe() com a chave (operação, algoritmo) já montada e valor em µs.
+        weight: chamadas representadas pela amostra (amostragem 1 de N)
+        """
+        if not self.enabled:
+            return
+        shard = getattr(self._local, "shard", None)
+        if shard is None or shard.generation != self._generation:
+            shard = self._shard()
+        histogram = shard.histograms.get(key)
+        if histogram is None:
+            histogram = shard.histograms[key] = LatencyHistogram()
+        histogram.record(value_us, weight)
+        if not success:
+            histogram.errors += weight
+
+    def observe_pool(self, pool: str, queue_wait_seconds: float, run_seconds: float):
+        """Espera na fila vs execução de uma tarefa de pool"""
+        if not self.enabled:
+            return
+        shard = self._shard()
+        for phase, seconds in (("queue_wait", queue_wait_seconds), ("compute", run_seconds)):
+            key = ("pool", pool, phase)
+            histogram = shard.histograms.get(key)
+            if histogram is None:
+                histogram = shard.histograms[key] = LatencyHistogram()
+            histogram.record(int(max(0.0, seconds) * 1_000_000))
+
+    # ------------------------------------------------------------------
+    # Snapshot / reset
+    # ------------------------------------------------------------------
+
+    def _merged(self, reset: bool = False) -> Dict[Tuple[str, ...], LatencyHistogram]:
+        """
+        Agregar shards da geração atual + aposentados. Com reset, a geração
+        avança e cada thread descarta o próprio shard na próxima gravação
+        (amostras gravadas durante a troca podem ser perdidas).
+        """
+        histograms: Dict[Tuple[str, ...], LatencyHistogram] = {}
+        with self._lock:
+            shards = list(self._shards)
+            generation = self._generation
+            _merge_into(histograms, self._retired)
+            if reset:
+                self._retired = {}
+                self._generation += 1
+                self._started_at = time.time()
+        for shard in shards:
+            if shard.generation == generation:
+                _merge_into(histograms, dict(shard.histograms))
+        return histograms
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """Resumo (quantis em ms) por operação/algoritmo, pools e contadores"""
+        since = self._started_at
+        histograms = self._merged(reset)
+        operations: Dict[str, Dict[str, Any]] = {}
+        pools: Dict[str, Dict[str, Any]] = {}
+        for key, histogram in sorted(histograms.items()):
+            if key[0] == "pool":
+                pools.setdefault(key[1], {})[key[2]] = histogram.summary()
+            else:
+                summary = histogram.summary()
+                summary["success_total"] = histogram.count - histogram.errors
+                summary["error_total"] = histogram.errors
+                operations.setdefault(key[0], {})[key[1]] = summary
+        return {
+            "since": since,
+            "window_seconds": time.time() - since,
+            "operations": operations,
+            "pools": pools
+        }
+
+    def reset(self):
+        self._merged(reset=True)
+
+    # ------------------------------------------------------------------
+    # Prometheus
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        escaped = (
+            f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+            for name, value in labels.items()
+        )
+        return "{" + ",".join(escaped) + "}"
+
+    def render_prometheus(self, gauges: Optional[Iterable[Tuple[str, str, Dict[str, Any], float]]] = None) -> str:
+        """
+        Texto de exposição Prometheus. `gauges`: (nome, help, labels, valor)
+        extras (ex: hit ratio de caches, profundidade de pools).
+        """
+        ns = self.namespace
+        histograms = self._merged()
+        lines: List[str] = []
+
+        def summary_block(name: str, help_text: str, items):
+            if not items:
+                return
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for labels, histogram in items:
+                for q in QUANTILES:
+                    lines.append(f"{name}{self._labels(**labels, quantile=f'{q:g}')} {histogram.quantile_us(q) / 1e6:.9f}")
+                lines.append(f"{name}_sum{self._labels(**labels)} {histogram.total_us / 1e6:.9f}")
+                lines.append(f"{name}_count{self._labels(**labels)} {histogram.count}")
+
+        ordered = sorted(histograms.items())
+        operations = [(k, h) for k, h in ordered if k[0] != "pool"]
+        summary_block(
+            f"{ns}_operation_latency_seconds", "Latência por operação e algoritmo",
+            [({"operation": k[0], "algorithm": k[1]}, h) for k, h in operations]
+        )
+        summary_block(
+            f"{ns}_pool_task_seconds", "Tempo de tarefas dos pools (espera na fila vs execução)",
+            [({"pool": k[1], "phase": k[2]}, h) for k, h in ordered if k[0] == "pool"]
+        )
+
+        if operations:
+            name = f"{ns}_operations_total"
+            lines.append(f"# HELP {name} Operações por status")
+            lines.append(f"# TYPE {name} counter")
+            for (operation, algorithm), histogram in operations:
+                for status, value in (("success", histogram.count - histogram.errors), ("error", histogram.errors)):
+                    lines.append(f"{name}{self._labels(operation=operation, algorithm=algorithm, status=status)} {value}")
+
+        declared = set()
+        for name, help_text, labels, value in gauges or ():
+            metric = f"{ns}_{name}"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{self._labels(**labels) if labels else ''} {float(value):g}")
+
+        return "\n".join(lines) + "\n"
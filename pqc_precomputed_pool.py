@@ -0,0 +1,367 @@
+# pqc_precomputed_pool.py
+# 🧊 POOL DE ASSINATURAS SPHINCS+ PRÉ-COMPUTADAS (MENSAGENS PREVISÍVEIS)
+"""
+Assinaturas SPHINCS+ calculadas antes do pedido para conjuntos de
+mensagens previsíveis (heartbeats, atestados de checkpoint, templates de
+commitment).
+
+- Registro por keypair: mensagens, digests sha3_512 conhecidos ou um
+  template (`"heartbeat:{}"` + valores) com janela de lookahead
+- Workers em background assinam a fila; `get()` é um lookup O(1) pelo
+  digest (hit/miss contabilizados)
+- Mensagens/digests avulsos ficam no pool (reutilizáveis); entradas de
+  template são consumidas no hit e o próximo valor entra na fila
+- Rotação de chave: fingerprint (chave pública) divergente no lookup,
+  ou `invalidate()`, descarta as assinaturas e re-assina tudo que está
+  registrado; resultados de uma geração anterior são descartados
+- Falha ao assinar: a entrada volta à fila com backoff exponencial; após
+  `max_attempts` falhas é removida do registro (não fica pendente para sempre)
+"""
+
+import time
+import heapq
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+from pqc_prehash import MessageDigest
+
+logger = logging.getLogger(__name__)
+
+
+class _TemplateFeed:
+    __slots__ = ("template", "values", "lookahead", "exhausted")
+
+    def __init__(self, template: str, values: Iterable[Any], lookahead: int):
+        self.template = template
+        self.values: Iterator[Any] = iter(values)
+        self.lookahead = lookahead
+        self.exhausted = False
+
+    def next_message(self) -> Optional[MessageDigest]:
+        if self.exhausted:
+            return None
+        try:
+            value = next(self.values)
+        except StopIteration:
+            self.exhausted = True
+            return None
+        return MessageDigest.of(self.template.format(value).encode())
+
+
+class _KeyLane:
+    __slots__ = ("keypair_id", "fingerprint", "generation", "sources", "signatures", "attempts", "hits", "misses",
+                 "precomputed", "errors", "dropped", "invalidations", "signing_ms_total")
+
+    def __init__(self, keypair_id: str, fingerprint: Optional[str]):
+        self.keypair_id = keypair_id
+        self.fingerprint = fingerprint
+        self.generation = 0
+        self.sources: Dict[bytes, tuple] = {}  # digest -> (MessageDigest, feed ou None)
+        self.signatures: Dict[bytes, str] = {}  # digest -> assinatura (base64)
+        self.attempts: Dict[bytes, int] = {}  # digest -> falhas consecutivas
+        self.hits = 0
+        self.misses = 0
+        self.precomputed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.invalidations = 0
+        self.signing_ms_total = 0.0
+
+
+class PrecomputedSignaturePool:
+    """Assinaturas pré-computadas por keypair, preenchidas em background"""
+
+    def __init__(
+        self,
+        sign_fn: Callable[[str, MessageDigest], Optional[str]],
+        workers: int = 1,
+        max_entries_per_key: int = 10000,
+        name: str = "precomputed-signatures",
+        max_attempts: int = 5,
+        retry_backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30.0
+    ):
+        """
+        max_attempts: falhas seguidas de sign_fn antes de remover a entrada
+        retry_backoff_seconds: atraso da 1ª nova tentativa (dobra a cada falha,
+        até max_backoff_seconds)
+        """
+        self.sign_fn = sign_fn
+        self.workers = max(1, workers)
+        self.max_entries_per_key = max_entries_per_key
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self._lanes: Dict[str, _KeyLane] = {}
+        self._queue = deque()  # (keypair_id, geração, digest)
+        self._retries = []  # heap (vence_em, keypair_id, geração, digest)
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopped = False
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def _lane(self, keypair_id: str, fingerprint: Optional[str]) -> _KeyLane:
+        lane = self._lanes.get(keypair_id)
+        if lane is None:
+            lane = self._lanes[keypair_id] = _KeyLane(keypair_id, fingerprint)
+        elif fingerprint is not None and lane.fingerprint != fingerprint:
+            self._invalidate_locked(lane, fingerprint)
+        return lane
+
+    def _add_locked(self, lane: _KeyLane, message: MessageDigest, feed: Optional[_TemplateFeed] = None) -> bool:
+        digest = message.digest()
+        if digest in lane.sources:
+            return False
+        if len(lane.sources) >= self.max_entries_per_key:
+            return False
+        lane.sources[digest] = (message, feed)
+        self._queue.append((lane.keypair_id, lane.generation, digest))
+        return True
+
+    def register_messages(
+        self,
+        keypair_id: str,
+        messages: Iterable[Union[bytes, MessageDigest]],
+        fingerprint: Optional[str] = None
+    ) -> int:
+        """Registrar mensagens fixas (reutilizáveis). Retorna quantas entraram na fila."""
+        prepared = [MessageDigest.of(message) for message in messages]
+        with self._cond:
+            lane = self._lane(keypair_id, fingerprint)
+            added = sum(1 for message in prepared if self._add_locked(lane, message))
+            self._cond.notify_all()
+        self.start()
+        return added
+
+    def register_digests(self, keypair_id: str, digests: Iterable[bytes], fingerprint: Optional[str] = None) -> int:
+        """Registrar digests sha3_512 conhecidos (assinados em modo hash-then-sign)"""
+        return self.register_messages(keypair_id, [MessageDigest.from_digest(d) for d in digests], fingerprint)
+
+    def register_template(
+        self,
+        keypair_id: str,
+        template: str,
+        values: Iterable[Any],
+        lookahead: int = 32,
+        fingerprint: Optional[str] = None
+    ) -> int:
+        """
+        Registrar template (`template.format(valor)`) com os próximos
+        `lookahead` valores sempre pré-assinados
+        """
+        feed = _TemplateFeed(template, values, max(1, lookahead))
+        with self._cond:
+            lane = self._lane(keypair_id, fingerprint)
+            added = 0
+            while added < feed.lookahead:
+                message = feed.next_message()
+                if message is None:
+                    break
+                if self._add_locked(lane, message, feed):
+                    added += 1
+            self._cond.notify_all()
+        self.start()
+        return added
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def has_keypair(self, keypair_id: str) -> bool:
+        return keypair_id in self._lanes
+
+    def get(
+        self,
+        keypair_id: str,
+        digest: bytes,
+        streamed: bool = False,
+        match_streamed: bool = False,
+        fingerprint: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Assinatura pré-computada para o digest sha3_512 (None em miss).
+        match_streamed: o payload assinado depende de a mensagem ser
+        streamed (backends reais assinam bytes, não o digest).
+        """
+        lane = self._lanes.get(keypair_id)
+        if lane is None:
+            return None
+        with self._cond:
+            if fingerprint is not None and lane.fingerprint != fingerprint:
+                self._invalidate_locked(lane, fingerprint)
+            signature = lane.signatures.get(digest)
+            source = lane.sources.get(digest) if signature is not None else None
+            if source is None or (match_streamed and source[0].streamed != streamed):
+                lane.misses += 1
+                return None
+            lane.hits += 1
+            feed = source[1]
+            if feed is not None:
+                # Entrada de template: consumida; manter a janela de lookahead cheia
+                del lane.signatures[digest]
+                self._remove_source_locked(lane, digest)
+            return signature
+
+    def _remove_source_locked(self, lane: _KeyLane, digest: bytes):
+        """Tirar a entrada do registro; entradas de template repõem a janela"""
+        _, feed = lane.sources.pop(digest)
+        lane.attempts.pop(digest, None)
+        if feed is not None:
+            message = feed.next_message()
+            if message is not None:
+                self._add_locked(lane, message, feed)
+                self._cond.notify()
+
+    # ------------------------------------------------------------------
+    # Invalidação
+    # ------------------------------------------------------------------
+
+    def _invalidate_locked(self, lane: _KeyLane, fingerprint: Optional[str] = None):
+        lane.generation += 1
+        lane.invalidations += 1
+        lane.signatures.clear()
+        lane.attempts.clear()
+        if fingerprint is not None:
+            lane.fingerprint = fingerprint
+        keypair_id = lane.keypair_id
+        self._queue = deque(item for item in self._queue if item[0] != keypair_id)
+        self._queue.extend((keypair_id, lane.generation, digest) for digest in lane.sources)
+        self._cond.notify_all()
+
+    def invalidate(self, keypair_id: str, fingerprint: Optional[str] = None):
+        """Descartar assinaturas do keypair (ex: rotação) e re-assinar o que está registrado"""
+        with self._cond:
+            lane = self._lanes.get(keypair_id)
+            if lane is not None:
+                self._invalidate_locked(lane, fingerprint)
+
+    def unregister(self, keypair_id: str):
+        """Remover keypair do pool (registros e assinaturas)"""
+        with self._cond:
+            if self._lanes.pop(keypair_id, None) is not None:
+                self._queue = deque(item for item in self._queue if item[0] != keypair_id)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Iniciar workers de pré-computação (daemon, idempotente)"""
+        with self._cond:
+            if self._threads:
+                return
+            self._stopped = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._fill_loop, name=f"{self.name}-{i}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def _promote_retries_locked(self) -> float:
+        """Mover novas tentativas vencidas para a fila; segundos até a próxima"""
+        now = time.monotonic()
+        while self._retries and self._retries[0][0] <= now:
+            _, keypair_id, generation, digest = heapq.heappop(self._retries)
+            self._queue.append((keypair_id, generation, digest))
+        return self._retries[0][0] - now if self._retries else 1.0
+
+    def _fill_loop(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    next_retry = self._promote_retries_locked()
+                    if self._queue:
+                        break
+                    self._cond.wait(timeout=min(1.0, next_retry))
+                if self._stopped:
+                    return
+                keypair_id, generation, digest = self._queue.popleft()
+                lane = self._lanes.get(keypair_id)
+                source = lane.sources.get(digest) if lane is not None and lane.generation == generation else None
+            if source is None:
+                continue
+
+            start = time.perf_counter()
+            try:
+                signature = self.sign_fn(keypair_id, source[0])
+            except Exception as e:
+                logger.warning(f"⚠️  Falha ao pré-computar assinatura para '{keypair_id}': {e}")
+                signature = None
+
+            with self._cond:
+                if self._lanes.get(keypair_id) is not lane or lane.generation != generation:
+                    continue  # Chave rotacionada/removida durante a assinatura
+                if signature is None:
+                    lane.errors += 1
+                    if digest in lane.sources:
+                        self._retry_locked(lane, generation, digest)
+                    continue
+                if digest in lane.sources:
+                    lane.attempts.pop(digest, None)
+                    lane.signatures[digest] = signature
+                    lane.precomputed += 1
+                    lane.signing_ms_total += (time.perf_counter() - start) * 1000
+
+    def _retry_locked(self, lane: _KeyLane, generation: int, digest: bytes):
+        """Reagendar com backoff exponencial ou, após max_attempts, remover a entrada"""
+        attempts = lane.attempts[digest] = lane.attempts.get(digest, 0) + 1
+        if attempts >= self.max_attempts:
+            logger.warning(
+                f"⚠️  Entrada pré-computada removida de '{lane.keypair_id}' após {attempts} falhas"
+            )
+            lane.dropped += 1
+            self._remove_source_locked(lane, digest)
+            return
+        delay = min(self.max_backoff_seconds, self.retry_backoff_seconds * (2 ** (attempts - 1)))
+        heapq.heappush(self._retries, (time.monotonic() + delay, lane.keypair_id, generation, digest))
+        self._cond.notify()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entradas prontas/pendentes e taxa de acerto por keypair + totais"""
+        with self._cond:
+            lanes = {}
+            for keypair_id, lane in self._lanes.items():
+                lookups = lane.hits + lane.misses
+                lanes[keypair_id] = {
+                    "ready": len(lane.signatures),
+                    "pending": len(lane.sources) - len(lane.signatures),
+                    "retrying": len(lane.attempts),
+                    "hits": lane.hits,
+                    "misses": lane.misses,
+                    "hit_ratio": lane.hits / lookups if lookups else 0.0,
+                    "precomputed": lane.precomputed,
+                    "errors": lane.errors,
+                    "dropped": lane.dropped,
+                    "invalidations": lane.invalidations,
+                    "avg_signing_ms": lane.signing_ms_total / lane.precomputed if lane.precomputed else 0.0
+                }
+            queued = len(self._queue) + len(self._retries)
+        totals = {"hits": 0, "misses": 0, "ready": 0, "pending": 0, "retrying": 0, "precomputed": 0, "errors": 0, "dropped": 0}
+        for stats in lanes.values():
+            for key in totals:
+                totals[key] += stats[key]
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_ratio"] = totals["hits"] / lookups if lookups else 0.0
+        return {
+            "running": bool(self._threads) and not self._stopped,
+            "workers": self.workers,
+            "queued": queued,
+            "keypairs": lanes,
+            "totals": totals
+        }
+
+    def stop(self, wait: bool = True):
+        """Parar workers (assinaturas prontas continuam servindo)"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        if wait:
+            for thread in threads:
+                thread.join(timeout=5)
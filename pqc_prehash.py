@@ -0,0 +1,121 @@
+# pqc_prehash.py
+# 🧮 DIGEST ÚNICO (STREAMING) COMPARTILHADO ENTRE AS LANES DE ASSINATURA
+"""
+Mensagem pré-hasheada para assinar payloads grandes (corpos de bloco,
+bundles de provas) sem materializar nem re-hashear os bytes várias vezes.
+
+- Chunks (arquivo, iterador) alimentam todos os hashes numa única passada
+- Memória de pico constante: arquivos são lidos em um buffer reutilizado
+- Lanes de assinatura pedem o digest de que precisam:
+    sha3_512 -> ML-DSA / SPHINCS+ / FALCON (simulados) e caches
+    sha256   -> ECDSA (Prehashed), mesma assinatura que sobre a mensagem
+    sha3_256 -> message_hash do multi-sig
+- Mensagens já em memória (`MessageDigest.of(bytes)`) calculam cada
+  digest sob demanda, uma única vez
+"""
+
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+DEFAULT_ALGORITHMS: Tuple[str, ...] = ("sha3_512", "sha256", "sha3_256")
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class MessageDigest:
+    """Digests de uma mensagem, calculados incrementalmente e compartilhados"""
+
+    __slots__ = ("message", "size", "_hashers", "_digests")
+
+    def __init__(self, algorithms: Iterable[str] = DEFAULT_ALGORITHMS, message: Optional[bytes] = None):
+        # message: bytes originais quando já estão em memória (digests sob demanda)
+        self.message = message
+        self.size = len(message) if message is not None else 0
+        self._hashers = {} if message is not None else {name: hashlib.new(name) for name in algorithms}
+        self._digests: Dict[str, bytes] = {}
+
+    @classmethod
+    def of(cls, message: Union[bytes, "MessageDigest"]) -> "MessageDigest":
+        """Normalizar bytes ou MessageDigest (sem cópia dos bytes)"""
+        if isinstance(message, cls):
+            return message
+        return cls(message=bytes(message) if not isinstance(message, bytes) else message)
+
+    @classmethod
+    def from_digest(cls, sha3_512_digest: bytes) -> "MessageDigest":
+        """Mensagem conhecida só pelo digest sha3_512 (equivale a uma streamed)"""
+        if len(sha3_512_digest) != 64:
+            raise ValueError("Digest sha3_512 deve ter 64 bytes")
+        digest = cls(algorithms=())
+        digest._digests["sha3_512"] = bytes(sha3_512_digest)
+        return digest
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[bytes], algorithms: Iterable[str] = DEFAULT_ALGORITHMS) -> "MessageDigest":
+        digest = cls(algorithms)
+        for chunk in chunks:
+            digest.update(chunk)
+        return digest
+
+    @classmethod
+    def from_file(cls, source, chunk_size: int = DEFAULT_CHUNK_SIZE, algorithms: Iterable[str] = DEFAULT_ALGORITHMS) -> "MessageDigest":
+        """Hashear arquivo (caminho ou objeto binário) com buffer de tamanho fixo"""
+        if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+            with open(source, "rb") as f:
+                return cls.from_file(f, chunk_size, algorithms)
+
+        digest = cls(algorithms)
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        readinto = getattr(source, "readinto", None)
+        while True:
+            if readinto is not None:
+                read = readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+            else:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        return digest
+
+    @property
+    def streamed(self) -> bool:
+        """True quando os bytes originais não estão disponíveis (só os digests)"""
+        return self.message is None
+
+    def update(self, chunk) -> "MessageDigest":
+        if self.message is not None:
+            raise ValueError("MessageDigest criado a partir de bytes não aceita update()")
+        if self._digests:
+            raise ValueError("MessageDigest já finalizado")
+        for hasher in self._hashers.values():
+            hasher.update(chunk)
+        self.size += len(chunk)
+        return self
+
+    def digest(self, algorithm: str = "sha3_512") -> bytes:
+        value = self._digests.get(algorithm)
+        if value is not None:
+            return value
+        if self.message is not None:
+            value = hashlib.new(algorithm, self.message).digest()
+        else:
+            hasher = self._hashers.get(algorithm)
+            if hasher is None:
+                raise ValueError(f"Digest {algorithm} não foi calculado no streaming")
+            value = hasher.digest()
+        self._digests[algorithm] = value
+        return value
+
+    def hexdigest(self, algorithm: str = "sha3_512") -> str:
+        return self.digest(algorithm).hex()
+
+    def signing_payload(self) -> bytes:
+        """
+        Payload para backends REAIS (liboqs), que assinam bytes: a mensagem
+        original quando disponível; senão o digest sha3_512 (hash-then-sign,
+        o verificador deve usar o mesmo pré-hash)
+        """
+        return self.message if self.message is not None else self.digest("sha3_512")
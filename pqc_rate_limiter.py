@@ -0,0 +1,258 @@
+# pqc_rate_limiter.py
+# 🚦 RATE LIMITER TOKEN BUCKET (SHARDS POR CHAVE + STORE COMPARTILHADO OPCIONAL)
+"""
+Rate limiting por chave (ex: blockchain + API key) para o QaaS.
+
+- Token bucket: capacidade = limite, recarga contínua de limite/janela
+  tokens por segundo (janela deslizante, sem o "reset" de hora cheia)
+- Buckets distribuídos em shards (hash da chave), cada um com seu próprio
+  lock: threads de chaves diferentes não disputam o mesmo lock, e
+  contadores de permitidos/rejeitados ficam no shard
+- Buckets ociosos (já recarregados) são descartados: memória limitada.
+  Sem store, um bucket parcialmente consumido nunca é descartado (voltaria
+  cheio): com o shard lotado de buckets ativos, chaves novas são rejeitadas
+- Store compartilhado opcional (SQLite WAL) para um limite global entre
+  processos: cada processo retira "leases" de tokens do bucket global e
+  os consome localmente; só volta ao store quando o lease acaba. Tokens
+  não usados voltam ao store na renovação seguinte
+"""
+
+import os
+import math
+import time
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SQLiteRateLimitStore:
+    """Buckets globais em SQLite (um arquivo compartilhado pelos processos)"""
+
+    def __init__(self, path: str, timeout: float = 5.0, purge_every: int = 1024):
+        self.path = path
+        self.timeout = timeout
+        self.purge_every = purge_every
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._calls = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Conexões SQLite não sobrevivem a fork (workers gunicorn): reabrir por processo
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                " key TEXT PRIMARY KEY,"
+                " tokens REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def acquire(self, key: str, capacity: float, rate: float, requested: float, returned: float = 0.0) -> float:
+        """
+        Retirar até `requested` tokens do bucket global (devolvendo `returned`
+        não usados). Retorna quantos tokens foram concedidos.
+        """
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    tokens = capacity
+                else:
+                    tokens = min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+                tokens = min(capacity, tokens + returned)
+                granted = min(requested, tokens)
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens - granted, now)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._calls += 1
+            if self.purge_every and self._calls % self.purge_every == 0:
+                self._purge(conn, now)
+        return granted
+
+    @staticmethod
+    def _purge(conn: sqlite3.Connection, now: float):
+        # Buckets sem uso há mais de um dia estão cheios: remover é equivalente
+        conn.execute("DELETE FROM rate_buckets WHERE updated_at < ?", (now - 86400,))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "allowed", "rejected", "store_calls")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [tokens, atualizado_em, capacidade, lease_expira_em, próxima_consulta_ao_store, recarga/s]
+        self.buckets: Dict[str, List[float]] = {}
+        self.allowed = 0
+        self.rejected = 0
+        self.store_calls = 0
+
+
+class TokenBucketRateLimiter:
+    """Token bucket por chave, em shards com lock próprio; store global opcional"""
+
+    def __init__(
+        self,
+        shards: int = 64,
+        max_keys: int = 100000,
+        store: Optional[SQLiteRateLimitStore] = None,
+        lease_fraction: float = 0.01,
+        lease_ttl_seconds: float = 1.0
+    ):
+        """
+        store: limite global entre processos (None = limite por processo)
+        lease_fraction: fração da capacidade retirada do store por renovação
+        lease_ttl_seconds: após esse tempo tokens locais não usados voltam ao store
+        """
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self.max_keys_per_shard = max(1, max_keys // len(self._shards))
+        self.store = store
+        self.lease_fraction = lease_fraction
+        self.lease_ttl_seconds = lease_ttl_seconds
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    def allow(self, key: str, limit: float, window_seconds: float = 3600.0, cost: float = 1.0) -> bool:
+        return self.check(key, limit, window_seconds, cost)[0]
+
+    def check(self, key: str, limit: float, window_seconds: float = 3600.0, cost: float = 1.0) -> Tuple[bool, float]:
+        """(permitido, segundos até haver `cost` tokens)"""
+        capacity = float(limit)
+        rate = capacity / window_seconds
+        shard = self._shard(key)
+        now = time.monotonic()
+        evicted = None
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None and len(shard.buckets) >= self.max_keys_per_shard:
+                evicted = self._evict_idle(shard, now)
+                if len(shard.buckets) >= self.max_keys_per_shard:
+                    # Nenhum bucket recarregado: não há como admitir a chave sem perder limites
+                    shard.rejected += 1
+                    return False, self._refill_eta(shard, now)
+            if self.store is None:
+                if bucket is None:
+                    bucket = shard.buckets[key] = [capacity, now, capacity, 0.0, 0.0, rate]
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            else:
+                if bucket is None:
+                    bucket = shard.buckets[key] = [0.0, now, capacity, 0.0, 0.0, rate]
+                tokens = bucket[0]
+                if (tokens < cost and now >= bucket[4]) or now >= bucket[3]:
+                    # Lease esgotado/expirado: devolver sobras e renovar no store global
+                    returned = tokens if now >= bucket[3] else 0.0
+                    lease = max(cost, math.ceil(capacity * self.lease_fraction))
+                    granted = self.store.acquire(key, capacity, rate, lease, returned=returned)
+                    shard.store_calls += 1
+                    tokens = (tokens - returned) + granted
+                    bucket[3] = now + self.lease_ttl_seconds
+                    if tokens < cost and rate > 0:
+                        # Bucket global vazio: rejeitar localmente até haver recarga
+                        bucket[4] = now + min((cost - tokens) / rate, self.lease_ttl_seconds)
+            bucket[1] = now
+            bucket[2] = capacity
+            bucket[5] = rate
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                shard.allowed += 1
+                result = (True, 0.0)
+            else:
+                bucket[0] = tokens
+                shard.rejected += 1
+                result = (False, (cost - tokens) / rate if rate > 0 else float("inf"))
+        if evicted:
+            self._return_leases(evicted)
+        return result
+
+    def refund(self, key: str, cost: float = 1.0):
+        """Devolver `cost` tokens a uma chave (pedido admitido aqui mas recusado por outro limite)"""
+        shard = self._shard(key)
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(bucket[2], bucket[0] + cost)
+                shard.allowed -= 1
+                shard.rejected += 1
+
+    def _evict_idle(self, shard: _Shard, now: float) -> List[Tuple[str, List[float]]]:
+        """
+        Descartar buckets ociosos. Retorna os buckets com lease a devolver ao
+        store (fora do lock do shard).
+        """
+        if self.store is None:
+            # Só buckets já recarregados (equivalem a ausentes): descartar um bucket
+            # parcialmente consumido devolveria a capacidade cheia à chave
+            refilled = [key for key, b in shard.buckets.items() if b[0] + (now - b[1]) * b[5] >= b[2]]
+            for key in refilled:
+                del shard.buckets[key]
+            return []
+        # Com store o estado fica no bucket global: descartar os mais antigos
+        by_age = sorted(shard.buckets.items(), key=lambda item: item[1][1])
+        evicted = []
+        for key, _ in by_age[:max(1, len(by_age) // 4)]:
+            bucket = shard.buckets.pop(key)
+            if bucket[0] > 0:
+                evicted.append((key, bucket))
+        return evicted
+
+    @staticmethod
+    def _refill_eta(shard: _Shard, now: float) -> float:
+        """Segundos até algum bucket do shard recarregar por completo"""
+        return min(
+            ((b[2] - b[0] - (now - b[1]) * b[5]) / b[5] if b[5] > 0 else float("inf"))
+            for b in shard.buckets.values()
+        )
+
+    def _return_leases(self, evicted: List[Tuple[str, List[float]]]):
+        """Devolver tokens de leases descartados ao bucket global (com a recarga do bucket)"""
+        for key, bucket in evicted:
+            self.store.acquire(key, bucket[2], bucket[5], 0.0, returned=bucket[0])
+
+    def reset(self, key: Optional[str] = None):
+        """Esquecer o estado local de uma chave (ou de todas)"""
+        shards = [self._shard(key)] if key is not None else self._shards
+        for shard in shards:
+            with shard.lock:
+                if key is None:
+                    shard.buckets.clear()
+                else:
+                    shard.buckets.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        allowed = rejected = store_calls = keys = 0
+        for shard in self._shards:
+            allowed += shard.allowed
+            rejected += shard.rejected
+            store_calls += shard.store_calls
+            keys += len(shard.buckets)
+        total = allowed + rejected
+        return {
+            "allowed": allowed,
+            "rejected": rejected,
+            "rejection_ratio": rejected / total if total else 0.0,
+            "active_keys": keys,
+            "shards": len(self._shards),
+            "shared_store": self.store.path if self.store is not None else None,
+            "store_calls": store_calls,
+            "requests_per_store_call": allowed / store_calls if store_calls else None
+        }
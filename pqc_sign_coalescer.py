@@ -0,0 +1,161 @@
+# pqc_sign_coalescer.py
+# 🧺 COALESCÊNCIA DE PEDIDOS DE ASSINATURA (MICRO-BATCHING POR KEYPAIR)
+"""
+Agrupa pedidos de assinatura concorrentes da mesma chave numa única
+chamada de lote ao backend.
+
+- Janela curta por keypair (padrão 2 ms) ou até `max_batch` itens (64)
+- Líder/seguidores: o primeiro pedido de uma janela abre o lote, espera
+  a janela (ou o lote encher) e assina todos; os demais só aguardam o
+  próprio resultado - sem thread dedicada, lotes de chaves diferentes
+  rodam em paralelo nas threads dos próprios pedidos
+- Sem concorrência (um único pedido em voo) o líder não espera a janela
+- Métricas: distribuição do tamanho dos lotes, motivo do flush e espera
+"""
+
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class _OpenBatch:
+    __slots__ = ("payloads", "results", "full", "done", "opened_at")
+
+    def __init__(self):
+        self.payloads: List[Any] = []
+        self.results: Optional[List[Any]] = None
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.opened_at = time.perf_counter()
+
+
+def _size_bucket(size: int) -> str:
+    """Faixa em potências de 2: "1", "2-3", "4-7", ..."""
+    low = 1 << (size.bit_length() - 1)
+    high = (low << 1) - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+
+class SignRequestCoalescer:
+    """Micro-batching de assinaturas: um lote por (chave, janela)"""
+
+    def __init__(
+        self,
+        sign_batch: Callable[[Hashable, List[Any]], List[Any]],
+        max_wait_ms: float = 2.0,
+        max_batch: int = 64,
+        wait_when_idle: bool = False
+    ):
+        """
+        sign_batch(chave, payloads) -> um resultado por payload (mesma ordem).
+        Uma exceção em sign_batch é entregue a todos os pedidos do lote.
+        """
+        self._sign_batch = sign_batch
+        self.max_wait_ms = max_wait_ms
+        self.max_batch = max(1, int(max_batch))
+        self.wait_when_idle = wait_when_idle
+        self._lock = threading.Lock()
+        self._open: Dict[Hashable, _OpenBatch] = {}
+        self._in_flight = 0
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "flush_full": 0,
+            "flush_window": 0,
+            "flush_idle": 0,
+            "errors": 0,
+            "wait_ms_total": 0.0,
+            "sign_ms_total": 0.0
+        }
+        self._batch_sizes: Dict[str, int] = {}
+
+    def configure(self, max_wait_ms: Optional[float] = None, max_batch: Optional[int] = None):
+        """Ajustar janela/tamanho máximo (vale para os próximos lotes)"""
+        if max_wait_ms is not None:
+            self.max_wait_ms = max(0.0, float(max_wait_ms))
+        if max_batch is not None:
+            self.max_batch = max(1, int(max_batch))
+
+    def submit(self, key: Hashable, payload: Any) -> Any:
+        """Assinar `payload` com a chave `key`, possivelmente junto de outros pedidos"""
+        with self._lock:
+            self._in_flight += 1
+            concurrent = self._in_flight > 1
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _OpenBatch()
+            index = len(batch.payloads)
+            batch.payloads.append(payload)
+            if len(batch.payloads) >= self.max_batch:
+                del self._open[key]
+                batch.full.set()
+        try:
+            if not leader:
+                batch.done.wait()
+            else:
+                self._lead(key, batch, concurrent)
+            if isinstance(batch.results, BaseException):
+                raise batch.results
+            return batch.results[index]
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _lead(self, key: Hashable, batch: _OpenBatch, concurrent: bool):
+        if batch.full.is_set():
+            reason = "flush_full"
+        elif not concurrent and not self.wait_when_idle:
+            reason = "flush_idle"
+        elif batch.full.wait(self.max_wait_ms / 1000):
+            reason = "flush_full"
+        else:
+            reason = "flush_window"
+        with self._lock:
+            # Fechar o lote: quem chegar depois abre o próximo
+            if self._open.get(key) is batch:
+                del self._open[key]
+            payloads = list(batch.payloads)
+        waited_ms = (time.perf_counter() - batch.opened_at) * 1000
+
+        started = time.perf_counter()
+        try:
+            results = self._sign_batch(key, payloads)
+            if len(results) != len(payloads):
+                raise RuntimeError(f"sign_batch retornou {len(results)} resultados para {len(payloads)} pedidos")
+            batch.results = results
+        except Exception as e:
+            batch.results = e
+        sign_ms = (time.perf_counter() - started) * 1000
+        batch.done.set()
+
+        size = len(payloads)
+        bucket = _size_bucket(size)
+        with self._lock:
+            stats = self._stats
+            stats["requests"] += size
+            stats["batches"] += 1
+            stats[reason] += 1
+            stats["wait_ms_total"] += waited_ms
+            stats["sign_ms_total"] += sign_ms
+            if size > stats["max_batch_size"]:
+                stats["max_batch_size"] = size
+            if isinstance(batch.results, BaseException):
+                stats["errors"] += 1
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            sizes = dict(self._batch_sizes)
+            stats["in_flight"] = self._in_flight
+            stats["open_batches"] = len(self._open)
+        batches = stats["batches"]
+        stats["avg_batch_size"] = stats["requests"] / batches if batches else 0.0
+        stats["avg_wait_ms"] = stats["wait_ms_total"] / batches if batches else 0.0
+        stats["avg_sign_ms"] = stats["sign_ms_total"] / batches if batches else 0.0
+        stats["batch_size_histogram"] = dict(sorted(sizes.items(), key=lambda item: int(item[0].split("-")[0])))
+        stats["max_wait_ms"] = self.max_wait_ms
+        stats["max_batch"] = self.max_batch
+        return stats
@@ -0,0 +1,177 @@
+# pqc_signers.py
+# ✍️ REGISTRO DE SIGNERS (AGNÓSTICO DE ALGORITMO) + KERNELS DE HASH EM LOTE
+"""
+Signers simulados de ML-DSA, SPHINCS+ e FALCON atrás de uma interface única.
+
+Construção simulada (igual à histórica do QuantumSecuritySystem):
+
+    assinatura = sha3_512(chave_privada || sha3_512(mensagem))
+
+- A chave privada é decodificada uma única vez e fica no KeyHandle
+- O prefixo sha3_512(chave) é pré-absorvido: cada assinatura é um
+  `copy()` + `update(digest)`, sem concatenar bytes
+- Kernel em lote: muitos digests por chamada; com pool de workers
+  (processos) os digests seguem em buffers contíguos, um por chunk
+- Novos algoritmos: `registry.register(nome, signer)`
+"""
+
+import hmac
+import base64
+import hashlib
+from typing import Any, Dict, List, Sequence
+
+DIGEST_SIZE = 64  # sha3_512
+
+
+def _sign_digests(prefix, digests: Sequence[bytes]) -> List[bytes]:
+    """Assinar digests a partir do estado de hash com a chave já absorvida"""
+    copy = prefix.copy
+    signatures = []
+    append = signatures.append
+    for digest in digests:
+        h = copy()
+        h.update(digest)
+        append(h.digest())
+    return signatures
+
+
+def _hash_kernel(key_bytes: bytes, buffer: bytes) -> bytes:
+    """
+    Kernel em lote: assina N digests concatenados (buffer contíguo) e
+    retorna as N assinaturas concatenadas. Função de módulo (picklable)
+    para rodar em pool de processos.
+    """
+    digests = [buffer[offset:offset + DIGEST_SIZE] for offset in range(0, len(buffer), DIGEST_SIZE)]
+    return b"".join(_sign_digests(hashlib.sha3_512(key_bytes), digests))
+
+
+class KeyHandle:
+    """Chave privada pré-decodificada + prefixo de hash já absorvido"""
+
+    __slots__ = ("keypair_id", "algorithm", "key_bytes", "_prefix")
+
+    def __init__(self, keypair_id: str, algorithm: str, key_bytes: bytes):
+        self.keypair_id = keypair_id
+        self.algorithm = algorithm
+        self.key_bytes = key_bytes
+        self._prefix = hashlib.sha3_512(key_bytes)
+
+    def sign_digest(self, digest: bytes) -> bytes:
+        h = self._prefix.copy()
+        h.update(digest)
+        return h.digest()
+
+
+class SimulatedHashSigner:
+    """
+    Signer simulado baseado em hash.
+
+    key_encoding:
+        "text"   -> bytes da string base64 armazenada (ML-DSA, SPHINCS+ no QRS-3)
+        "base64" -> chave decodificada do base64 (sign_with_sphincs, FALCON)
+    """
+
+    def __init__(self, algorithm: str, key_encoding: str = "text", batch_chunk_size: int = 8192):
+        if key_encoding not in ("text", "base64"):
+            raise ValueError(f"key_encoding inválido: {key_encoding}")
+        self.algorithm = algorithm
+        self.key_encoding = key_encoding
+        self.batch_chunk_size = batch_chunk_size
+
+    def load_key(self, keypair_id: str, keypair: Dict) -> KeyHandle:
+        private_key = keypair.get("private_key")
+        if private_key is None:
+            # Fallback histórico: keypair_id como seed
+            key_bytes = hashlib.sha3_512(keypair_id.encode()).digest()
+        elif self.key_encoding == "base64":
+            key_bytes = base64.b64decode(private_key)
+        else:
+            key_bytes = private_key.encode() if isinstance(private_key, str) else bytes(private_key)
+        return KeyHandle(keypair_id, self.algorithm, key_bytes)
+
+    def sign_digest(self, handle: KeyHandle, digest: bytes) -> bytes:
+        return handle.sign_digest(digest)
+
+    def sign(self, handle: KeyHandle, message: bytes) -> bytes:
+        return handle.sign_digest(hashlib.sha3_512(message).digest())
+
+    def verify_digest(self, handle: KeyHandle, digest: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(handle.sign_digest(digest), signature)
+
+    def sign_digests_batch(self, handle: KeyHandle, digests: Sequence[bytes], pool: Any = None) -> List[bytes]:
+        """
+        Assinar muitos digests numa chamada. Com `pool` (ex: SigningWorkerPool
+        de processos) cada chunk segue como um buffer contíguo para um worker.
+        """
+        if not digests:
+            return []
+        chunk_size = self.batch_chunk_size
+        if pool is None or len(digests) <= chunk_size:
+            return _sign_digests(handle._prefix, digests)
+
+        futures = [
+            pool.submit(_hash_kernel, handle.key_bytes, b"".join(digests[i:i + chunk_size]))
+            for i in range(0, len(digests), chunk_size)
+        ]
+        signed = b"".join(future.result() for future in futures)
+        if len(signed) != len(digests) * DIGEST_SIZE:
+            raise ValueError("Digests devem ter 64 bytes (sha3_512)")
+        return [signed[offset:offset + DIGEST_SIZE] for offset in range(0, len(signed), DIGEST_SIZE)]
+
+    def sign_batch(self, handle: KeyHandle, messages: Sequence[bytes], pool: Any = None) -> List[bytes]:
+        sha3_512 = hashlib.sha3_512
+        return self.sign_digests_batch(handle, [sha3_512(m).digest() for m in messages], pool)
+
+
+class SignerRegistry:
+    """Signers por nome + cache de KeyHandles (chaves pré-decodificadas)"""
+
+    def __init__(self, handle_cache=None):
+        self._signers: Dict[str, SimulatedHashSigner] = {}
+        self._handles = handle_cache if handle_cache is not None else {}
+
+    def register(self, name: str, signer) -> None:
+        self._signers[name] = signer
+
+    def get(self, name: str):
+        signer = self._signers.get(name)
+        if signer is None:
+            raise KeyError(f"Signer não registrado: {name}")
+        return signer
+
+    def names(self) -> List[str]:
+        return sorted(self._signers)
+
+    def handle(self, name: str, keypair_id: str, keypair: Dict) -> KeyHandle:
+        """KeyHandle do keypair para o signer (decodificado uma única vez)"""
+        cache_key = (name, keypair_id)
+        handle = self._handles.get(cache_key)
+        if handle is None:
+            handle = self.get(name).load_key(keypair_id, keypair)
+            if hasattr(self._handles, "put"):
+                self._handles.put(cache_key, handle, size=len(handle.key_bytes) + 256)
+            else:
+                self._handles[cache_key] = handle
+        return handle
+
+    def invalidate(self, keypair_id: str) -> None:
+        """Descartar handles de um keypair (ex: rotação de chave)"""
+        for name in self._signers:
+            self._handles.pop((name, keypair_id), None)
+
+    def sign_digest(self, name: str, keypair_id: str, keypair: Dict, digest: bytes) -> bytes:
+        return self.get(name).sign_digest(self.handle(name, keypair_id, keypair), digest)
+
+    def verify_digest(self, name: str, keypair_id: str, keypair: Dict, digest: bytes, signature: bytes) -> bool:
+        return self.get(name).verify_digest(self.handle(name, keypair_id, keypair), digest, signature)
+
+
+def default_signer_registry(handle_cache=None) -> SignerRegistry:
+    """Registro com os signers simulados do QuantumSecuritySystem"""
+    registry = SignerRegistry(handle_cache)
+    registry.register("ML-DSA", SimulatedHashSigner("ML-DSA", key_encoding="text"))
+    registry.register("SPHINCS+", SimulatedHashSigner("SPHINCS+", key_encoding="base64"))
+    # QRS-3 sempre usou a string base64 da chave SPHINCS+ (mantido para não invalidar assinaturas)
+    registry.register("SPHINCS+ (QRS-3)", SimulatedHashSigner("SPHINCS+", key_encoding="text"))
+    registry.register("FALCON", SimulatedHashSigner("FALCON", key_encoding="base64"))
+    return registry
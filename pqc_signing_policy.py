@@ -0,0 +1,229 @@
+# pqc_signing_policy.py
+# 🎛️ POLÍTICA ADAPTATIVA DE ASSINATURA (LATÊNCIA MEDIDA + PISO DE SEGURANÇA)
+"""
+Motor de política para sign_hybrid_intelligent.
+
+- Histogramas de latência/falhas em janela deslizante por conjunto de
+  algoritmos ("ml_dsa", "qrs2", "qrs3")
+- Decisão: o nível preferido (pelo valor/tipo da transação) é rebaixado
+  enquanto o p95 medido estoura o orçamento de latência ou a taxa de
+  falhas passa do limite - nunca abaixo do piso de segurança
+- Piso padrão = nível preferido (sem rebaixamento): rebaixar é opt-in via
+  `security_floor` ou `max_downgrade_steps`; transações críticas (QRS-3)
+  nunca são rebaixadas sem piso explícito
+- Decisões contabilizadas como métricas (escolhas, rebaixamentos,
+  orçamento estourado no piso)
+"""
+
+import time
+import bisect
+import threading
+from typing import Any, Dict, List, Optional
+
+# Nível de segurança = número de algoritmos independentes (todos quantum-safe exceto ECDSA)
+SECURITY_LEVELS = {"ml_dsa": 1, "qrs2": 2, "qrs3": 3}
+MODES_BY_LEVEL = {level: mode for mode, level in SECURITY_LEVELS.items()}
+
+# Limites dos buckets (ms): ~0.1 ms a ~20 s em passos de 1.5x
+_BUCKET_BOUNDS = [0.1 * 1.5 ** i for i in range(31)]
+
+
+class RollingLatencyHistogram:
+    """Histograma de latência + falhas em janela deslizante (anel de slots)"""
+
+    def __init__(self, window_seconds: float = 60.0, slots: int = 6):
+        self.slot_seconds = window_seconds / slots
+        self._slots: List[Dict[str, Any]] = [self._empty_slot(-1) for _ in range(slots)]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _empty_slot(epoch: int) -> Dict[str, Any]:
+        return {"epoch": epoch, "buckets": [0] * (len(_BUCKET_BOUNDS) + 1), "count": 0, "failures": 0}
+
+    def _slot(self, now: float) -> Dict[str, Any]:
+        epoch = int(now / self.slot_seconds)
+        index = epoch % len(self._slots)
+        slot = self._slots[index]
+        if slot["epoch"] != epoch:
+            slot = self._slots[index] = self._empty_slot(epoch)
+        return slot
+
+    def record(self, latency_ms: float, success: bool = True, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            slot = self._slot(now)
+            slot["count"] += 1
+            if success:
+                slot["buckets"][bisect.bisect_left(_BUCKET_BOUNDS, latency_ms)] += 1
+            else:
+                slot["failures"] += 1
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Contagens e percentis (limite superior do bucket) da janela atual"""
+        now = time.time() if now is None else now
+        oldest = int(now / self.slot_seconds) - len(self._slots) + 1
+        buckets = [0] * (len(_BUCKET_BOUNDS) + 1)
+        count = failures = 0
+        with self._lock:
+            for slot in self._slots:
+                if slot["epoch"] >= oldest:
+                    count += slot["count"]
+                    failures += slot["failures"]
+                    for i, n in enumerate(slot["buckets"]):
+                        buckets[i] += n
+
+        successes = count - failures
+        percentiles = {}
+        for name, q in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            if not successes:
+                percentiles[name] = None
+                continue
+            target = q * successes
+            running = 0
+            for i, n in enumerate(buckets):
+                running += n
+                if running >= target:
+                    percentiles[name] = _BUCKET_BOUNDS[i] if i < len(_BUCKET_BOUNDS) else float("inf")
+                    break
+        return {
+            "count": count,
+            "failures": failures,
+            "failure_rate": failures / count if count else 0.0,
+            **percentiles
+        }
+
+
+class AdaptiveSigningPolicy:
+    """Escolhe o conjunto de algoritmos pelo orçamento de latência sem furar o piso"""
+
+    def __init__(
+        self,
+        latency_budget_ms: float = 50.0,
+        max_failure_rate: float = 0.05,
+        min_samples: int = 20,
+        window_seconds: float = 60.0,
+        min_security_floor: int = 1,
+        max_downgrade_steps: int = 0
+    ):
+        self.latency_budget_ms = latency_budget_ms
+        self.max_failure_rate = max_failure_rate
+        self.min_samples = min_samples
+        self.min_security_floor = min_security_floor
+        self.max_downgrade_steps = max_downgrade_steps
+        self._histograms = {mode: RollingLatencyHistogram(window_seconds) for mode in SECURITY_LEVELS}
+        self._lock = threading.Lock()
+        self._decisions: Dict[str, int] = {}
+        self._downgrades = 0
+        self._budget_exceeded_at_floor = 0
+
+    @staticmethod
+    def preferred_level(transaction_value: float, transaction_type: str = "normal") -> int:
+        """Nível preferido (regra histórica: > $10.000 QRS-3, > $1.000 QRS-2, senão ML-DSA)"""
+        if transaction_value > 10000 or transaction_type == "critical":
+            return 3
+        if transaction_value > 1000:
+            return 2
+        return 1
+
+    def default_floor(self, preferred_level: int) -> int:
+        """
+        Piso padrão (sem `security_floor` explícito): o próprio nível preferido,
+        ou até `max_downgrade_steps` níveis abaixo dele - exceto QRS-3 (crítico)
+        """
+        if preferred_level >= SECURITY_LEVELS["qrs3"]:
+            return preferred_level
+        return max(self.min_security_floor, preferred_level - self.max_downgrade_steps)
+
+    def record(self, mode: str, latency_ms: float, success: bool):
+        histogram = self._histograms.get(mode)
+        if histogram is not None:
+            histogram.record(latency_ms, success)
+
+    def _fits(self, mode: str, budget_ms: float) -> Dict[str, Any]:
+        stats = self._histograms[mode].snapshot()
+        if stats["count"] < self.min_samples:
+            return {"fits": True, "reason": "insufficient_samples", "stats": stats}
+        if stats["failure_rate"] > self.max_failure_rate:
+            return {"fits": False, "reason": "failure_rate", "stats": stats}
+        if stats["p95_ms"] is not None and stats["p95_ms"] > budget_ms:
+            return {"fits": False, "reason": "latency_budget", "stats": stats}
+        return {"fits": True, "reason": "within_budget", "stats": stats}
+
+    def decide(
+        self,
+        preferred_level: int,
+        security_floor: Optional[int] = None,
+        latency_budget_ms: Optional[float] = None,
+        available_modes: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Do nível preferido até o piso: primeiro modo disponível cujo p95 cabe
+        no orçamento. Se nenhum couber, usa o piso (segurança > latência).
+        """
+        budget = self.latency_budget_ms if latency_budget_ms is None else latency_budget_ms
+        if security_floor is None:
+            security_floor = self.default_floor(preferred_level)
+        floor = max(1, min(security_floor, 3))
+        preferred = max(floor, min(preferred_level, 3))
+        available = set(available_modes) if available_modes is not None else set(SECURITY_LEVELS)
+
+        skipped = []
+        chosen = None
+        for level in range(preferred, floor - 1, -1):
+            mode = MODES_BY_LEVEL[level]
+            if mode not in available:
+                skipped.append({"mode": mode, "reason": "unavailable"})
+                continue
+            check = self._fits(mode, budget)
+            if check["fits"]:
+                chosen = {"mode": mode, "reason": check["reason"]}
+                break
+            skipped.append({"mode": mode, "reason": check["reason"], "p95_ms": check["stats"]["p95_ms"]})
+
+        if chosen is None:
+            # Nenhum modo cabe no orçamento: ficar no nível mais baixo permitido e disponível
+            fallback = next(
+                (MODES_BY_LEVEL[level] for level in range(floor, preferred + 1) if MODES_BY_LEVEL[level] in available),
+                None
+            )
+            if fallback is None:
+                return {"success": False, "error": "Nenhum conjunto de algoritmos disponível acima do piso de segurança"}
+            chosen = {"mode": fallback, "reason": "budget_exceeded_at_floor"}
+
+        level = SECURITY_LEVELS[chosen["mode"]]
+        with self._lock:
+            key = f"{MODES_BY_LEVEL[preferred]}->{chosen['mode']}"
+            self._decisions[key] = self._decisions.get(key, 0) + 1
+            if level < preferred:
+                self._downgrades += 1
+            if chosen["reason"] == "budget_exceeded_at_floor":
+                self._budget_exceeded_at_floor += 1
+
+        return {
+            "success": True,
+            "mode": chosen["mode"],
+            "security_level": level,
+            "preferred_level": preferred,
+            "security_floor": floor,
+            "latency_budget_ms": budget,
+            "reason": chosen["reason"],
+            "downgraded": level < preferred,
+            "skipped": skipped
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            decisions = dict(self._decisions)
+            downgrades = self._downgrades
+            exceeded = self._budget_exceeded_at_floor
+        return {
+            "latency_budget_ms": self.latency_budget_ms,
+            "max_failure_rate": self.max_failure_rate,
+            "min_samples": self.min_samples,
+            "min_security_floor": self.min_security_floor,
+            "max_downgrade_steps": self.max_downgrade_steps,
+            "decisions": decisions,
+            "downgrades": downgrades,
+            "budget_exceeded_at_floor": exceeded,
+            "modes": {mode: histogram.snapshot() for mode, histogram in self._histograms.items()}
+        }
@@ -0,0 +1,146 @@
+# pqc_sphincs_workers.py
+# 🧵 ASSINATURA SPHINCS+ EM MÚLTIPLOS NÚCLEOS (POOL DE PROCESSOS)
+"""
+Backend opcional de processos para a lane SPHINCS+ (e jobs em lote).
+
+- Cada worker mantém seus próprios contextos liboqs (oqs.Signature com a
+  chave secreta) ou handles simulados, carregados uma vez no initializer
+- Pedidos e respostas cruzam o pipe do pool apenas como bytes brutos
+  (keypair_id + payload -> assinatura)
+- Chaves registradas depois do pool iniciar seguem junto das tarefas
+  (material pequeno) e ficam em cache no worker
+- Tamanho do pool configurável (padrão: os.cpu_count())
+
+Material de chave: (tipo, algoritmo, chave_secreta)
+    ("oqs", "SPHINCS+-SHA2-128f-simple", sk)  -> liboqs
+    ("simulated", "SPHINCS+", chave)           -> sha3_512(chave || digest)
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pqc_worker_pool import SigningWorkerPool
+from pqc_signers import KeyHandle
+
+KeyMaterial = Tuple[str, str, bytes]
+
+# Estado do processo worker (preenchido pelo initializer)
+_WORKER_KEYS: Dict[str, Any] = {}
+
+
+def _load_worker_key(keypair_id: str, material: KeyMaterial):
+    kind, algorithm, secret_key = material
+    if kind == "oqs":
+        import oqs
+        signer = oqs.Signature(algorithm, secret_key)
+    else:
+        signer = KeyHandle(keypair_id, algorithm, secret_key)
+    _WORKER_KEYS[keypair_id] = (kind, signer)
+    return _WORKER_KEYS[keypair_id]
+
+
+def _init_worker(materials: Dict[str, KeyMaterial]):
+    """Initializer: carregar contextos/chaves uma única vez por processo"""
+    for keypair_id, material in materials.items():
+        _load_worker_key(keypair_id, material)
+
+
+def _sign_in_worker(keypair_id: str, payloads: List[bytes], material: Optional[KeyMaterial] = None) -> List[bytes]:
+    """Assinar payloads (digest sha3_512 no modo simulado, mensagem no liboqs)"""
+    entry = _WORKER_KEYS.get(keypair_id)
+    if entry is None:
+        if material is None:
+            raise KeyError(f"Chave SPHINCS+ não carregada no worker: {keypair_id}")
+        entry = _load_worker_key(keypair_id, material)
+    kind, signer = entry
+    if kind == "oqs":
+        return [signer.sign(payload) for payload in payloads]
+    return [signer.sign_digest(payload) for payload in payloads]
+
+
+class SphincsProcessSigner:
+    """Pool de processos dedicado à assinatura SPHINCS+"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue_depth: int = 256,
+        chunk_size: int = 32,
+        observer: Optional[Callable[[str, float, float], None]] = None
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue_depth = max_queue_depth
+        self.chunk_size = max(1, chunk_size)
+        self._materials: Dict[str, KeyMaterial] = {}
+        self._preloaded = set()
+        self._observer = observer
+        self._pool: Optional[SigningWorkerPool] = None
+        self._lock = threading.Lock()
+
+    def has_key(self, keypair_id: str) -> bool:
+        return keypair_id in self._materials
+
+    def register_key(self, keypair_id: str, material: KeyMaterial):
+        """Registrar chave (antes do start vai no initializer; depois, junto das tarefas)"""
+        self._materials[keypair_id] = material
+
+    def unregister_key(self, keypair_id: str):
+        """Esquecer chave (ex: rotação); workers com a chave em cache são reciclados"""
+        if self._materials.pop(keypair_id, None) is not None and keypair_id in self._preloaded:
+            self.restart()
+
+    def _get_pool(self) -> SigningWorkerPool:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    materials = dict(self._materials)
+                    self._preloaded = set(materials)
+                    self._pool = SigningWorkerPool(
+                        max_workers=self.workers,
+                        backend="process",
+                        max_queue_depth=self.max_queue_depth,
+                        submit_timeout=5.0,  # chunks de sign_many aguardam vaga
+                        name="sphincs-processes",
+                        initializer=_init_worker,
+                        initargs=(materials,),
+                        observer=self._observer
+                    )
+        return self._pool
+
+    def _submit(self, keypair_id: str, payloads: List[bytes]):
+        material = None if keypair_id in self._preloaded else self._materials.get(keypair_id)
+        return self._get_pool().submit(_sign_in_worker, keypair_id, payloads, material)
+
+    def sign(self, keypair_id: str, payload: bytes) -> bytes:
+        return self._submit(keypair_id, [payload]).result()[0]
+
+    def sign_many(self, keypair_id: str, payloads: List[bytes]) -> List[bytes]:
+        """Lote dividido em chunks distribuídos entre os processos"""
+        futures = [
+            self._submit(keypair_id, payloads[i:i + self.chunk_size])
+            for i in range(0, len(payloads), self.chunk_size)
+        ]
+        return [signature for future in futures for signature in future.result()]
+
+    def restart(self):
+        """Recriar workers (recarrega o initializer com as chaves atuais)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        pool_stats = self._pool.get_stats() if self._pool is not None else None
+        return {
+            "workers": self.workers,
+            "registered_keys": len(self._materials),
+            "preloaded_keys": len(self._preloaded),
+            "pool": pool_stats
+        }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
@@ -0,0 +1,203 @@
+# pqc_worker_pool.py
+# ⚙️ POOL DE WORKERS DE LONGA DURAÇÃO PARA ASSINATURAS PQC
+"""
+Executor compartilhado (thread ou processo) para as lanes de assinatura.
+
+- Criado sob demanda uma única vez e reutilizado por todas as chamadas
+- Fila limitada (max_workers + max_queue_depth tarefas em voo) com backpressure:
+  por padrão submit() não bloqueia - fila cheia levanta WorkerPoolSaturated
+  na hora e o chamador degrada (ex: assina na própria thread)
+- Shutdown gracioso (também registrado em atexit)
+- Métricas de tempo de espera na fila vs tempo de execução
+
+Backend "process" exige que a função e os argumentos sejam picklable
+(funções de módulo + bytes). Métodos ligados a QuantumSecuritySystem
+devem usar o backend "thread".
+"""
+
+import os
+import time
+import atexit
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class WorkerPoolSaturated(RuntimeError):
+    """Fila do pool cheia: o chamador deve aguardar, degradar ou rejeitar"""
+
+
+def _timed_call(enqueued_at: float, fn: Callable, args: tuple, kwargs: dict):
+    """Executar tarefa registrando início/fim (módulo-level para ser picklable)"""
+    started_at = time.time()
+    result = fn(*args, **kwargs)
+    return result, started_at, time.time()
+
+
+class SigningWorkerPool:
+    """Executor de longa duração com backpressure e métricas"""
+
+    BACKENDS = ("thread", "process")
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        backend: str = "thread",
+        max_queue_depth: int = 256,
+        submit_timeout: Optional[float] = 0.0,
+        name: str = "pqc-signing",
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+        observer: Optional[Callable[[str, float, float], None]] = None
+    ):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend inválido: {backend} (use {', '.join(self.BACKENDS)})")
+
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.backend = backend
+        self.max_queue_depth = max_queue_depth
+        self.submit_timeout = submit_timeout
+        self.name = name
+        self._initializer = initializer
+        self._initargs = initargs
+        # observer(nome_do_pool, espera_na_fila_s, execução_s) - ex: MetricsRegistry.observe_pool
+        self._observer = observer
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_workers + max_queue_depth)
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "in_flight": 0,
+            "queue_wait_ms_total": 0.0,
+            "queue_wait_ms_max": 0.0,
+            "run_ms_total": 0.0,
+            "run_ms_max": 0.0
+        }
+
+    def _get_executor(self):
+        """Criar executor sob demanda (uma única vez)"""
+        if self._executor is None:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError(f"Pool {self.name} já foi encerrado")
+                if self._executor is None:
+                    if self.backend == "process":
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            initializer=self._initializer,
+                            initargs=self._initargs
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix=self.name,
+                            initializer=self._initializer,
+                            initargs=self._initargs
+                        )
+                    atexit.register(self.shutdown)
+        return self._executor
+
+    def submit(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Future:
+        """
+        Submeter tarefa. Com a fila cheia espera até `timeout` (padrão:
+        submit_timeout; 0 = não bloqueia, None = espera indefinidamente) e
+        então levanta WorkerPoolSaturated.
+        """
+        wait = self.submit_timeout if timeout is None else timeout
+        acquired = self._slots.acquire(timeout=wait) if wait is not None else self._slots.acquire()
+        if not acquired:
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            raise WorkerPoolSaturated(f"Pool {self.name} saturado ({self.max_workers} workers, fila {self.max_queue_depth})")
+
+        outer = Future()
+        enqueued_at = time.time()
+        try:
+            inner = self._get_executor().submit(_timed_call, enqueued_at, fn, args, kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._stats_lock:
+            self._stats["submitted"] += 1
+            self._stats["in_flight"] += 1
+
+        def _on_done(fut: Future):
+            self._slots.release()
+            if fut.cancelled():
+                with self._stats_lock:
+                    self._stats["in_flight"] -= 1
+                    self._stats["cancelled"] += 1
+                return
+            error = fut.exception()
+            with self._stats_lock:
+                self._stats["in_flight"] -= 1
+                if error is not None:
+                    self._stats["failed"] += 1
+            if outer.cancelled():
+                return
+            if error is not None:
+                outer.set_exception(error)
+                return
+            result, started_at, finished_at = fut.result()
+            self._record_timing((started_at - enqueued_at) * 1000, (finished_at - started_at) * 1000)
+            outer.set_result(result)
+
+        def _propagate_cancel(fut: Future):
+            # Cancelar o Future retornado cancela a tarefa se ela ainda estiver na fila
+            if fut.cancelled():
+                inner.cancel()
+
+        inner.add_done_callback(_on_done)
+        outer.add_done_callback(_propagate_cancel)
+        return outer
+
+    def map_unordered(self, fn: Callable, items, timeout: Optional[float] = None):
+        """Submeter fn(item) para cada item e retornar a lista de futures (ordem de entrada)"""
+        return [self.submit(fn, item, timeout=timeout) for item in items]
+
+    def _record_timing(self, wait_ms: float, run_ms: float):
+        with self._stats_lock:
+            stats = self._stats
+            stats["completed"] += 1
+            stats["queue_wait_ms_total"] += wait_ms
+            stats["run_ms_total"] += run_ms
+            if wait_ms > stats["queue_wait_ms_max"]:
+                stats["queue_wait_ms_max"] = wait_ms
+            if run_ms > stats["run_ms_max"]:
+                stats["run_ms_max"] = run_ms
+        if self._observer is not None:
+            self._observer(self.name, wait_ms / 1000, run_ms / 1000)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas do pool: espera na fila vs tempo de execução"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        completed = stats["completed"]
+        stats["queue_wait_ms_avg"] = stats["queue_wait_ms_total"] / completed if completed else 0.0
+        stats["run_ms_avg"] = stats["run_ms_total"] / completed if completed else 0.0
+        stats["backend"] = self.backend
+        stats["max_workers"] = self.max_workers
+        stats["max_queue_depth"] = self.max_queue_depth
+        stats["started"] = self._executor is not None
+        return stats
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """Encerrar o pool aguardando (ou cancelando) tarefas pendentes"""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            try:
+                executor.shutdown(wait=wait, cancel_futures=cancel_pending)
+            except TypeError:
+                # Python 3.8: cancel_futures não existe
+                executor.shutdown(wait=wait)
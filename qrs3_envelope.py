@@ -0,0 +1,161 @@
+# qrs3_envelope.py
+# 📦 ENVELOPE BINÁRIO COMPACTO PARA ASSINATURAS QRS-3
+"""
+Formato binário versionado e com prefixo de tamanho para blocos que
+carregam milhares de assinaturas QRS-3 (substitui dict + base64 + texto).
+
+Layout (big-endian), versão 1:
+
+    cabeçalho : magic "Q3" | versão u8 | flags u8 | quantidade u32
+    registro  : len(keypair_id) u16 | keypair_id utf-8
+                [len(mensagem) u32 | mensagem]        (se FLAG_MESSAGES)
+                nº de componentes u8
+                componente: algoritmo u8 | len u32 | assinatura bruta
+
+A decodificação trabalha sobre memoryview: assinaturas e mensagens são
+fatias do buffer original (sem cópia). Apenas o keypair_id é decodificado
+para str (usado como chave de lookup).
+"""
+
+import base64
+import struct
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+MAGIC = b"Q3"
+VERSION = 1
+
+FLAG_MESSAGES = 0x01
+
+# Identificadores de algoritmo (estáveis: fazem parte do formato)
+ALG_ECDSA_SECP256K1 = 1
+ALG_ML_DSA = 2
+ALG_SPHINCS = 3
+ALG_FALCON = 4
+
+ALGORITHM_NAMES = {
+    ALG_ECDSA_SECP256K1: "ECDSA-secp256k1",
+    ALG_ML_DSA: "ML-DSA",
+    ALG_SPHINCS: "SPHINCS+",
+    ALG_FALCON: "FALCON"
+}
+
+# Campos do dict QRS-3 (base64) <-> algoritmo
+QRS3_FIELDS = (
+    ("classic_signature", ALG_ECDSA_SECP256K1),
+    ("ml_dsa_signature", ALG_ML_DSA),
+    ("sphincs_signature", ALG_SPHINCS)
+)
+
+_HEADER = struct.Struct(">2sBBI")
+_KEY_LEN = struct.Struct(">H")
+_MSG_LEN = struct.Struct(">I")
+_COMPONENT = struct.Struct(">BI")
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class EnvelopeFormatError(ValueError):
+    """Envelope truncado, versão desconhecida ou campos inválidos"""
+
+
+class EnvelopeEntry(NamedTuple):
+    keypair_id: str
+    signatures: Dict[int, BytesLike]  # algoritmo -> assinatura bruta (memoryview na decodificação)
+    message: Optional[BytesLike] = None
+
+
+def entry_from_qrs3_signature(keypair_id: str, qrs3_signature: Dict, message: Optional[bytes] = None) -> EnvelopeEntry:
+    """Converter assinatura QRS-3 (dict base64 de sign_qrs3) em entrada binária"""
+    signatures = {}
+    for field, algorithm in QRS3_FIELDS:
+        value = qrs3_signature.get(field)
+        if value:
+            signatures[algorithm] = base64.b64decode(value)
+    return EnvelopeEntry(keypair_id, signatures, message)
+
+
+def entry_to_qrs3_signature(entry: EnvelopeEntry) -> Dict:
+    """Inverso de entry_from_qrs3_signature (dict base64 compatível com batch_verify_qrs3)"""
+    qrs3_signature = {}
+    for field, algorithm in QRS3_FIELDS:
+        value = entry.signatures.get(algorithm)
+        if value is not None:
+            qrs3_signature[field] = base64.b64encode(value).decode()
+    return qrs3_signature
+
+
+def encode_envelope(entries: Iterable[EnvelopeEntry], include_messages: bool = False) -> bytes:
+    """Serializar entradas no envelope binário (versão atual)"""
+    entries = list(entries)
+    parts = [_HEADER.pack(MAGIC, VERSION, FLAG_MESSAGES if include_messages else 0, len(entries))]
+    for entry in entries:
+        key = entry.keypair_id.encode("utf-8")
+        if len(key) > 0xFFFF:
+            raise EnvelopeFormatError("keypair_id muito longo")
+        parts.append(_KEY_LEN.pack(len(key)))
+        parts.append(key)
+        if include_messages:
+            message = entry.message if entry.message is not None else b""
+            parts.append(_MSG_LEN.pack(len(message)))
+            parts.append(message)
+        if len(entry.signatures) > 0xFF:
+            raise EnvelopeFormatError("Componentes demais em uma entrada")
+        parts.append(bytes((len(entry.signatures),)))
+        for algorithm, signature in entry.signatures.items():
+            parts.append(_COMPONENT.pack(algorithm, len(signature)))
+            parts.append(signature)
+    return b"".join(parts)
+
+
+def read_header(buffer: BytesLike) -> Dict:
+    """Validar cabeçalho e retornar versão, flags e quantidade de entradas"""
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise EnvelopeFormatError("Envelope truncado (cabeçalho)")
+    magic, version, flags, count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise EnvelopeFormatError("Magic inválido: não é um envelope QRS-3")
+    if version != VERSION:
+        raise EnvelopeFormatError(f"Versão de envelope não suportada: {version}")
+    return {"version": version, "flags": flags, "count": count, "has_messages": bool(flags & FLAG_MESSAGES)}
+
+
+def iter_envelope(buffer: BytesLike) -> Iterator[EnvelopeEntry]:
+    """Iterar entradas sem copiar assinaturas/mensagens (fatias memoryview do buffer)"""
+    view = memoryview(buffer)
+    if view.format != "B" or view.ndim != 1:
+        view = view.cast("B")
+    header = read_header(view)
+    has_messages = header["has_messages"]
+    end = len(view)
+    offset = _HEADER.size
+
+    def take(size: int) -> memoryview:
+        nonlocal offset
+        if offset + size > end:
+            raise EnvelopeFormatError("Envelope truncado")
+        chunk = view[offset:offset + size]
+        offset += size
+        return chunk
+
+    for _ in range(header["count"]):
+        key_len, = _KEY_LEN.unpack(take(_KEY_LEN.size))
+        keypair_id = str(take(key_len), "utf-8")
+        message = None
+        if has_messages:
+            msg_len, = _MSG_LEN.unpack(take(_MSG_LEN.size))
+            message = take(msg_len)
+        components = take(1)[0]
+        signatures = {}
+        for _ in range(components):
+            algorithm, sig_len = _COMPONENT.unpack(take(_COMPONENT.size))
+            signatures[algorithm] = take(sig_len)
+        yield EnvelopeEntry(keypair_id, signatures, message)
+
+    if offset != end:
+        raise EnvelopeFormatError("Bytes extras após a última entrada")
+
+
+def decode_envelope(buffer: BytesLike) -> List[EnvelopeEntry]:
+    """Decodificar envelope completo (lista de entradas com memoryviews)"""
+    return list(iter_envelope(buffer))
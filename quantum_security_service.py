@@ -10,15 +10,70 @@ import json
 import time
 import hashlib
 import base64
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime, timezone
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from functools import wraps
+from itertools import islice
 import threading
-from collections import defaultdict
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait as wait_futures
 
-from quantum_security import QuantumSecuritySystem
+from quantum_security import get_quantum_security
 from pqc_key_manager import PQCKeyManager
+from pqc_sign_coalescer import SignRequestCoalescer
+from pqc_cache import BoundedCache, PartitionedCache
+from pqc_worker_pool import SigningWorkerPool, WorkerPoolSaturated
+from pqc_rate_limiter import SQLiteRateLimitStore, TokenBucketRateLimiter
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _json_flag(value: Any, default: bool) -> bool:
+    """Flag booleano do corpo JSON (a string "false" é falsa); ValueError se inválido"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str):
+        normalized = value.strip().lower()
+        if normalized in ("1", "true", "yes", "on"):
+            return True
+        if normalized in ("0", "false", "no", "off", ""):
+            return False
+    raise ValueError(f"Valor booleano inválido: {value!r}")
+
+
+# Nomes equivalentes aceitos pela API (mesma chave no cache negativo)
+_ALGORITHM_ALIASES = {"ML-DSA-128": "ML-DSA", "SLH-DSA": "SPHINCS+"}
+
+
+def _negative_key(keypair_id: str, algorithm: str) -> Tuple[str, str]:
+    return keypair_id, _ALGORITHM_ALIASES.get(algorithm, algorithm)
+
+
+def _keypair_not_found_response(transaction_hash: str) -> Dict[str, Any]:
+    """Mesma resposta para keypair inexistente, vinda do backend ou do cache negativo"""
+    return {
+        "success": False,
+        "error": "Keypair não encontrado",
+        "error_code": "keypair_not_found",
+        "transaction_hash": transaction_hash
+    }
+
+
+def _keypair_not_found(result: Any) -> bool:
+    """Falha explícita de keypair inexistente (None/erros transitórios não entram no cache negativo)"""
+    if not isinstance(result, dict) or result.get("success", True):
+        return False
+    error = str(result.get("error", "")).lower()
+    return result.get("error_code") == "keypair_not_found" or "not found" in error or "não encontrado" in error
+
 
 class QuantumSecurityService:
     """
@@ -32,25 +87,114 @@ class QuantumSecurityService:
     - Cache e otimizações
     """
     
-    def __init__(self):
-        self.quantum_security = QuantumSecuritySystem()
+    def __init__(
+        self,
+        sign_batch_window_ms: Optional[float] = None,
+        sign_max_batch: Optional[int] = None,
+        signature_cache_max_entries: Optional[int] = None,
+        signature_cache_max_bytes: Optional[int] = None,
+        cache_ttl_seconds: Optional[float] = None,
+        blockchain_cache_quota: Optional[float] = None,
+        negative_cache_ttl_seconds: Optional[float] = None,
+        batch_workers: Optional[int] = None,
+        batch_chunk_size: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+        rate_limit_window_seconds: Optional[float] = None,
+        rate_limit_store_path: Optional[str] = None,
+        rate_limit_api_key_share: Optional[float] = None
+    ):
+        """
+        Caches limitados (valores None usam as variáveis de ambiente QAAS_*):
+            signature_cache_max_entries / _max_bytes: orçamento global de assinaturas
+            cache_ttl_seconds: TTL de assinaturas e chaves
+            blockchain_cache_quota: fração do orçamento que uma blockchain pode ocupar
+            negative_cache_ttl_seconds: quanto tempo um keypair inválido é lembrado
+        
+        Lotes (/signature/batch): batch_workers threads, chunks de batch_chunk_size
+        transações, no máximo max_batch_size transações por pedido.
+        
+        Rate limit: token bucket por blockchain (teto) recarregado ao longo de
+        rate_limit_window_seconds; cada X-API-Key tem um sub-limite de
+        rate_limit_api_key_share do teto. rate_limit_store_path (SQLite) torna
+        o limite global entre processos/workers.
+        """
+        self.quantum_security = get_quantum_security()
         self.key_manager = PQCKeyManager()
         
-        # Cache de chaves por blockchain
-        self.key_cache = {}  # blockchain -> keypair_id -> keypair
-        self.signature_cache = {}  # hash -> signature (para evitar re-assinaturas)
+        # Micro-batching de /signature/sign: pedidos ML-DSA da mesma chave que
+        # chegam dentro da janela viram uma única chamada de lote ao backend
+        self.sign_coalescer = SignRequestCoalescer(
+            self._sign_ml_dsa_batch,
+            max_wait_ms=sign_batch_window_ms if sign_batch_window_ms is not None
+            else float(os.environ.get("QAAS_SIGN_BATCH_WINDOW_MS", "2")),
+            max_batch=sign_max_batch if sign_max_batch is not None
+            else int(os.environ.get("QAAS_SIGN_MAX_BATCH", "64"))
+        )
+        
+        # Caches limitados (LRU + TTL) com cota por blockchain
+        max_entries = int(signature_cache_max_entries or _env_number("QAAS_SIGNATURE_CACHE_MAX_ENTRIES", 100000))
+        max_bytes = int(signature_cache_max_bytes or _env_number("QAAS_SIGNATURE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        ttl = cache_ttl_seconds if cache_ttl_seconds is not None else _env_number("QAAS_CACHE_TTL_SECONDS", 3600)
+        quota = blockchain_cache_quota if blockchain_cache_quota is not None else _env_number("QAAS_BLOCKCHAIN_CACHE_QUOTA", 0.5)
+        # blockchain -> (transaction_hash, keypair_id, algorithm) -> resultado (para evitar re-assinaturas)
+        self.signature_cache = PartitionedCache(
+            "qaas_signatures",
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl_seconds=ttl,
+            partition_max_entries=max(1, int(max_entries * quota)),
+            partition_max_bytes=max(1, int(max_bytes * quota))
+        )
+        # blockchain -> keypair_id -> keypair
+        key_entries = max(1, max_entries // 10)
+        self.key_cache = PartitionedCache(
+            "qaas_keys",
+            max_entries=key_entries,
+            ttl_seconds=ttl,
+            partition_max_entries=max(1, int(key_entries * quota))
+        )
+        # (keypair_id, algoritmo normalizado) inexistentes: evita consultar o PQCKeyManager a cada pedido repetido
+        self.negative_cache = BoundedCache(
+            "qaas_negative",
+            max_entries=max(1, max_entries // 10),
+            ttl_seconds=negative_cache_ttl_seconds if negative_cache_ttl_seconds is not None
+            else _env_number("QAAS_NEGATIVE_CACHE_TTL_SECONDS", 30)
+        )
+        # Verificações positivas: (sha256 pubkey, sha256 mensagem, sha256 assinatura) -> real
+        self.verify_cache = BoundedCache(
+            "qaas_verify",
+            max_entries=int(_env_number("QAAS_VERIFY_CACHE_MAX_ENTRIES", max_entries)),
+            ttl_seconds=ttl
+        )
         
-        # Estatísticas
+        # Pool de workers para /signature/batch (chunks de transações em paralelo)
+        self.batch_chunk_size = max(1, int(batch_chunk_size or _env_number("QAAS_BATCH_CHUNK_SIZE", 64)))
+        self.max_batch_size = int(max_batch_size or _env_number("QAAS_MAX_BATCH_SIZE", 50000))
+        self.batch_pool = SigningWorkerPool(
+            max_workers=int(batch_workers or _env_number("QAAS_BATCH_WORKERS", 4)),
+            backend="thread",
+            name="qaas-batch"
+        )
+        
+        # Estatísticas (atualizadas também pelas threads do batch_pool: usar _count)
+        self._stats_lock = threading.Lock()
         self.stats = {
             "keys_generated": 0,
             "signatures_created": 0,
             "verifications": 0,
-            "blockchains_supported": [],
-            "total_requests": 0
+            "blockchains_supported": []
         }
         
-        # Rate limiting por blockchain
-        self.rate_limits = defaultdict(lambda: {"count": 0, "reset_time": time.time() + 3600})
+        # Rate limiting por blockchain/API key (token bucket em shards; store SQLite opcional)
+        self.rate_limit_window_seconds = (rate_limit_window_seconds if rate_limit_window_seconds is not None
+                                          else _env_number("QAAS_RATE_LIMIT_WINDOW_SECONDS", 3600))
+        self.rate_limit_api_key_share = (rate_limit_api_key_share if rate_limit_api_key_share is not None
+                                         else _env_number("QAAS_RATE_LIMIT_API_KEY_SHARE", 0.5))
+        store_path = rate_limit_store_path or os.environ.get("QAAS_RATE_LIMIT_DB")
+        self.rate_limiter = TokenBucketRateLimiter(
+            shards=int(_env_number("QAAS_RATE_LIMIT_SHARDS", 64)),
+            store=SQLiteRateLimitStore(store_path) if store_path else None
+        )
         
         print("🔐 QUANTUM SECURITY SERVICE: Inicializado!")
         print("🌐 Serviço disponível para outras blockchains")
@@ -92,13 +236,13 @@ class QuantumSecurityService:
                 keypair = self.key_manager.generate_ml_dsa_keypair(key_id)
             
             # Armazenar no cache
-            if blockchain not in self.key_cache:
-                self.key_cache[blockchain] = {}
-            self.key_cache[blockchain][keypair["keypair_id"]] = keypair
+            self.key_cache.put(blockchain, keypair["keypair_id"], keypair)
+            self.negative_cache.pop(_negative_key(keypair["keypair_id"], algorithm))
             
-            self.stats["keys_generated"] += 1
-            if blockchain not in self.stats["blockchains_supported"]:
-                self.stats["blockchains_supported"].append(blockchain)
+            with self._stats_lock:
+                self.stats["keys_generated"] += 1
+                if blockchain not in self.stats["blockchains_supported"]:
+                    self.stats["blockchains_supported"].append(blockchain)
             
             return {
                 "success": True,
@@ -123,7 +267,8 @@ class QuantumSecurityService:
         blockchain: str,
         transaction_hash: str,
         keypair_id: str,
-        algorithm: str = "ML-DSA-128"
+        algorithm: str = "ML-DSA-128",
+        coalesce: bool = False
     ) -> Dict[str, Any]:
         """
         Assinar hash de transação com PQC
@@ -133,6 +278,7 @@ class QuantumSecurityService:
             transaction_hash: Hash SHA-256 da transação
             keypair_id: ID do keypair PQC
             algorithm: Algoritmo PQC
+            coalesce: Agrupar com pedidos concorrentes da mesma chave (ML-DSA)
         
         Returns:
             {
@@ -145,9 +291,9 @@ class QuantumSecurityService:
         """
         try:
             # Verificar cache
-            cache_key = f"{blockchain}_{transaction_hash}_{keypair_id}"
-            if cache_key in self.signature_cache:
-                cached = self.signature_cache[cache_key]
+            cache_key = (transaction_hash, keypair_id, algorithm)
+            cached = self.signature_cache.get(blockchain, cache_key)
+            if cached is not None:
                 return {
                     "success": True,
                     "signature": cached["signature"],
@@ -158,20 +304,31 @@ class QuantumSecurityService:
                     "from_cache": True
                 }
             
+            # Keypair inexistente visto há pouco: responder sem consultar o backend
+            negative_key = _negative_key(keypair_id, algorithm)
+            if self.negative_cache.get(negative_key) is not None:
+                return _keypair_not_found_response(transaction_hash)
+            
             # Converter hash para bytes (remover "0x" se presente)
             tx_hash_clean = transaction_hash.replace("0x", "").replace("0X", "")
             hash_bytes = bytes.fromhex(tx_hash_clean)
             
             # Assinar usando key_manager
-            if algorithm in ["ML-DSA-128", "ML-DSA"]:
-                result = self.key_manager.sign_ml_dsa(keypair_id, hash_bytes)
-            else:
-                result = self.key_manager._sign_mock(keypair_id, hash_bytes, algorithm)
+            try:
+                if algorithm in ["ML-DSA-128", "ML-DSA"]:
+                    if coalesce:
+                        result = self.sign_coalescer.submit(keypair_id, hash_bytes)
+                    else:
+                        result = self.key_manager.sign_ml_dsa(keypair_id, hash_bytes)
+                else:
+                    result = self.key_manager._sign_mock(keypair_id, hash_bytes, algorithm)
+            except KeyError:
+                result = {"success": False, "error_code": "keypair_not_found"}
             
-            if result:
+            if result and result.get("signature"):
                 # Armazenar no cache
-                self.signature_cache[cache_key] = result
-                self.stats["signatures_created"] += 1
+                self.signature_cache.put(blockchain, cache_key, result)
+                self._count("signatures_created")
                 
                 return {
                     "success": True,
@@ -183,6 +340,11 @@ class QuantumSecurityService:
                     "from_cache": False
                 }
             else:
+                # Só "keypair não encontrado" é lembrado: falhas transitórias (ex: um
+                # item de lote coalescido) não podem bloquear a chave inteira
+                if _keypair_not_found(result):
+                    self.negative_cache.put(negative_key, True)
+                    return _keypair_not_found_response(transaction_hash)
                 return {
                     "success": False,
                     "error": "Falha ao assinar transação",
@@ -195,6 +357,24 @@ class QuantumSecurityService:
                 "transaction_hash": transaction_hash
             }
     
+    def _count(self, name: str, amount: int = 1):
+        """Incrementar estatística (chamado de várias threads)"""
+        with self._stats_lock:
+            self.stats[name] += amount
+    
+    def _sign_ml_dsa_batch(self, keypair_id: str, hashes: List[bytes]) -> List[Optional[Dict[str, Any]]]:
+        """Lote do coalescer: uma chamada ao backend para todos os hashes da janela"""
+        sign_many = getattr(self.key_manager, "sign_ml_dsa_batch", None)
+        if sign_many is not None:
+            return sign_many(keypair_id, hashes)
+        # Backend sem API de lote: mesma chave, assinada em sequência numa só passagem
+        return [self.key_manager.sign_ml_dsa(keypair_id, hash_bytes) for hash_bytes in hashes]
+    
+    def configure_sign_batching(self, window_ms: Optional[float] = None, max_batch: Optional[int] = None) -> Dict[str, Any]:
+        """Ajustar janela (ms) e tamanho máximo dos lotes de /signature/sign"""
+        self.sign_coalescer.configure(max_wait_ms=window_ms, max_batch=max_batch)
+        return {"success": True, "window_ms": self.sign_coalescer.max_wait_ms, "max_batch": self.sign_coalescer.max_batch}
+    
     def verify_signature(
         self,
         blockchain: str,
@@ -222,19 +402,15 @@ class QuantumSecurityService:
         """
         try:
             hash_bytes = bytes.fromhex(transaction_hash)
-            sig_bytes = base64.b64decode(signature)
-            
-            if algorithm in ["ML-DSA-128", "ML-DSA"]:
-                result = self.key_manager.verify_ml_dsa(public_key, hash_bytes, signature)
-            else:
-                result = {"success": True, "real": False, "note": "Mock verification"}
-            
-            self.stats["verifications"] += 1
+            public_key_digest = hashlib.sha256(public_key.encode()).digest()
+            _, valid, real, _, _ = self._verify_group(
+                public_key, public_key_digest, [(0, hash_bytes, signature)], algorithm
+            )[0]
             
             return {
-                "valid": result.get("success", False),
+                "valid": valid,
                 "algorithm": algorithm,
-                "real": result.get("real", False),
+                "real": real,
                 "blockchain": blockchain
             }
         except Exception as e:
@@ -244,6 +420,142 @@ class QuantumSecurityService:
                 "blockchain": blockchain
             }
     
+    def _verify_cache_key(self, public_key_digest: bytes, hash_bytes: bytes, signature: str) -> bytes:
+        return (public_key_digest + hashlib.sha256(hash_bytes).digest()
+                + hashlib.sha256(signature.encode()).digest())
+    
+    def _verify_group(
+        self,
+        public_key: str,
+        public_key_digest: bytes,
+        entries: List[Tuple[int, bytes, str]],
+        algorithm: str
+    ) -> List[Tuple[int, bool, bool, bool, Optional[str]]]:
+        """
+        Verificar itens de uma mesma chave pública: [(índice, hash, assinatura)]
+        -> [(índice, válido, real, do_cache, erro)]
+        """
+        if algorithm not in ["ML-DSA-128", "ML-DSA"]:
+            self._count("verifications", len(entries))
+            return [(index, True, False, False, None) for index, _, _ in entries]
+        
+        results = []
+        misses = []
+        for index, hash_bytes, signature in entries:
+            cache_key = self._verify_cache_key(public_key_digest, hash_bytes, signature)
+            real = self.verify_cache.get(cache_key)
+            if real is not None:
+                results.append((index, True, real, True, None))
+            else:
+                misses.append((index, hash_bytes, signature, cache_key))
+        
+        if misses:
+            # Chave pública interpretada uma única vez por grupo quando o backend oferece lote
+            verify_many = getattr(self.key_manager, "verify_ml_dsa_batch", None)
+            if verify_many is not None:
+                verified = verify_many(public_key, [(hash_bytes, signature) for _, hash_bytes, signature, _ in misses])
+            else:
+                verified = []
+                for _, hash_bytes, signature, _ in misses:
+                    try:
+                        verified.append(self.key_manager.verify_ml_dsa(public_key, hash_bytes, signature))
+                    except Exception as e:
+                        verified.append({"success": False, "error": str(e)})
+            for (index, _, _, cache_key), result in zip(misses, verified):
+                valid = bool(result and result.get("success", False))
+                real = bool(result and result.get("real", False))
+                if valid:
+                    self.verify_cache.put(cache_key, real, size=97)
+                results.append((index, valid, real, False, None if valid else (result or {}).get("error")))
+        
+        self._count("verifications", len(entries))
+        return results
+    
+    def batch_verify(
+        self,
+        blockchain: str,
+        items: List[Dict[str, Any]],
+        algorithm: str = "ML-DSA-128"
+    ) -> Dict[str, Any]:
+        """
+        Verificar muitas assinaturas numa chamada
+        
+        Args:
+            blockchain: Nome da blockchain
+            items: Lista de {transaction_hash, signature, public_key}
+            algorithm: Algoritmo PQC
+        
+        Returns:
+            {
+                "valid": List[bool] (mesma ordem de items),
+                "all_valid": bool,
+                "valid_count": int,
+                "cached": int,
+                "elapsed_ms": float
+            }
+        """
+        start_time = time.perf_counter()
+        valid = [False] * len(items)
+        errors: Dict[str, str] = {}
+        
+        # Agrupar por chave pública distinta (hash da chave calculado uma vez)
+        groups: Dict[str, List[Tuple[int, bytes, str]]] = {}
+        for index, item in enumerate(items):
+            try:
+                public_key, signature = item["public_key"], item["signature"]
+                if not isinstance(public_key, str) or not isinstance(signature, str):
+                    raise ValueError("public_key and signature must be strings")
+                hash_bytes = bytes.fromhex(item["transaction_hash"].replace("0x", "").replace("0X", ""))
+                groups.setdefault(public_key, []).append((index, hash_bytes, signature))
+            except Exception as e:
+                errors[str(index)] = f"Invalid item: {e}"
+        
+        # Chunks de cada grupo distribuídos pelo pool (saturado: verifica na própria thread)
+        tasks = []
+        for public_key, entries in groups.items():
+            public_key_digest = hashlib.sha256(public_key.encode()).digest()
+            for offset in range(0, len(entries), self.batch_chunk_size):
+                chunk = entries[offset:offset + self.batch_chunk_size]
+                try:
+                    future = self.batch_pool.submit(
+                        self._verify_group, public_key, public_key_digest, chunk, algorithm, timeout=0
+                    )
+                except (WorkerPoolSaturated, RuntimeError):
+                    future = None
+                tasks.append((public_key, public_key_digest, chunk, future))
+        
+        cached = 0
+        real_count = 0
+        for public_key, public_key_digest, chunk, future in tasks:
+            try:
+                chunk_results = (future.result() if future is not None
+                                 else self._verify_group(public_key, public_key_digest, chunk, algorithm))
+            except Exception as e:
+                chunk_results = [(index, False, False, False, str(e)) for index, _, _ in chunk]
+            for index, is_valid, real, from_cache, error in chunk_results:
+                valid[index] = is_valid
+                cached += from_cache
+                real_count += real
+                if error:
+                    errors[str(index)] = error
+        
+        valid_count = sum(valid)
+        response = {
+            "valid": valid,
+            "all_valid": valid_count == len(items),
+            "total": len(items),
+            "valid_count": valid_count,
+            "cached": cached,
+            "real": real_count,
+            "distinct_public_keys": len(groups),
+            "algorithm": algorithm,
+            "blockchain": blockchain,
+            "elapsed_ms": (time.perf_counter() - start_time) * 1000
+        }
+        if errors:
+            response["errors"] = errors
+        return response
+    
     def batch_sign(
         self,
         blockchain: str,
@@ -272,14 +584,7 @@ class QuantumSecurityService:
         successful = 0
         failed = 0
         
-        for tx in transactions:
-            tx_hash = tx.get("transaction_hash") or tx.get("hash")
-            if not tx_hash:
-                failed += 1
-                results.append({"error": "Transaction hash missing"})
-                continue
-            
-            result = self.sign_transaction(blockchain, tx_hash, keypair_id, algorithm)
+        for _, result in self.iter_batch_sign(blockchain, transactions, keypair_id, algorithm, ordered=True):
             if result.get("success"):
                 successful += 1
             else:
@@ -294,6 +599,131 @@ class QuantumSecurityService:
             "blockchain": blockchain
         }
     
+    def _sign_batch_item(self, blockchain: str, tx: Any, keypair_id: str, algorithm: str) -> Dict[str, Any]:
+        """Uma transação do lote (erros ficam isolados no item)"""
+        tx_hash = (tx.get("transaction_hash") or tx.get("hash")) if isinstance(tx, dict) else None
+        if not tx_hash:
+            return {"error": "Transaction hash missing"}
+        try:
+            return self.sign_transaction(blockchain, tx_hash, keypair_id, algorithm)
+        except Exception as e:
+            return {"success": False, "error": str(e), "transaction_hash": tx_hash}
+    
+    def _sign_batch_chunk(
+        self,
+        blockchain: str,
+        chunk: List[Tuple[int, Any]],
+        keypair_id: str,
+        algorithm: str
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        return [(index, self._sign_batch_item(blockchain, tx, keypair_id, algorithm)) for index, tx in chunk]
+    
+    def iter_batch_sign(
+        self,
+        blockchain: str,
+        transactions: List[Dict[str, Any]],
+        keypair_id: str,
+        algorithm: str = "ML-DSA-128",
+        ordered: bool = True
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        (índice, resultado) de cada transação à medida que os chunks terminam
+        
+        - Chunks de batch_chunk_size transações distribuídos pelo batch_pool
+        - No máximo 2x workers chunks em voo (memória limitada em lotes grandes)
+        - ordered=False entrega cada chunk assim que ele termina
+        - Pool saturado: o chunk é assinado na própria thread do pedido
+        """
+        items = enumerate(transactions)
+        pending = deque()  # (chunk, future) em ordem de submissão
+        window = self.batch_pool.max_workers * 2
+        
+        def submit_next() -> bool:
+            chunk = list(islice(items, self.batch_chunk_size))
+            if not chunk:
+                return False
+            try:
+                future = self.batch_pool.submit(
+                    self._sign_batch_chunk, blockchain, chunk, keypair_id, algorithm, timeout=0
+                )
+            except (WorkerPoolSaturated, RuntimeError):
+                future = None
+            pending.append((chunk, future))
+            return True
+        
+        def chunk_results(chunk, future) -> List[Tuple[int, Dict[str, Any]]]:
+            if future is None:
+                return self._sign_batch_chunk(blockchain, chunk, keypair_id, algorithm)
+            try:
+                return future.result()
+            except Exception as e:
+                return [(index, {"success": False, "error": str(e)}) for index, _ in chunk]
+        
+        try:
+            while len(pending) < window and submit_next():
+                pass
+            while pending:
+                if ordered or pending[0][1] is None:
+                    done = [pending.popleft()]
+                else:
+                    finished, _ = wait_futures(
+                        [future for _, future in pending if future is not None], return_when=FIRST_COMPLETED
+                    )
+                    done = [entry for entry in pending if entry[1] in finished]
+                    for entry in done:
+                        pending.remove(entry)
+                for chunk, future in done:
+                    yield from chunk_results(chunk, future)
+                while len(pending) < window and submit_next():
+                    pass
+        finally:
+            # Cliente desconectou / gerador fechado: descartar chunks ainda na fila
+            for _, future in pending:
+                if future is not None:
+                    future.cancel()
+    
+    def stream_batch_sign(
+        self,
+        blockchain: str,
+        transactions: List[Dict[str, Any]],
+        keypair_id: str,
+        algorithm: str = "ML-DSA-128",
+        ordered: bool = True
+    ) -> Iterator[str]:
+        """
+        Linhas NDJSON: uma por transação ({"index": i, ...resultado}) e uma
+        linha final {"summary": {...}} com totais e tempos
+        """
+        start_time = time.perf_counter()
+        first_result_ms = None
+        successful = failed = from_cache = 0
+        
+        for index, result in self.iter_batch_sign(blockchain, transactions, keypair_id, algorithm, ordered):
+            if first_result_ms is None:
+                first_result_ms = (time.perf_counter() - start_time) * 1000
+            if result.get("success"):
+                successful += 1
+                if result.get("from_cache"):
+                    from_cache += 1
+            else:
+                failed += 1
+            yield json.dumps({"index": index, **result}) + "\n"
+        
+        elapsed = time.perf_counter() - start_time
+        yield json.dumps({
+            "summary": {
+                "total": len(transactions),
+                "successful": successful,
+                "failed": failed,
+                "from_cache": from_cache,
+                "blockchain": blockchain,
+                "ordered": ordered,
+                "elapsed_ms": elapsed * 1000,
+                "first_result_ms": first_result_ms,
+                "signatures_per_second": len(transactions) / elapsed if elapsed > 0 else None
+            }
+        }) + "\n"
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Retornar estatísticas do serviço"""
         return {
@@ -301,9 +731,18 @@ class QuantumSecurityService:
             "signatures_created": self.stats["signatures_created"],
             "verifications": self.stats["verifications"],
             "blockchains_supported": self.stats["blockchains_supported"],
-            "total_requests": self.stats["total_requests"],
+            "total_requests": self.rate_limiter.get_stats()["allowed"],
+            "rate_limiter": self.rate_limiter.get_stats(),
             "cache_size": len(self.signature_cache),
-            "key_cache_size": sum(len(keys) for keys in self.key_cache.values())
+            "key_cache_size": len(self.key_cache),
+            "batch_pool": self.batch_pool.get_stats(),
+            "caches": {
+                "signatures": self.signature_cache.get_stats(),
+                "keys": self.key_cache.get_stats(),
+                "negative": self.negative_cache.get_stats(),
+                "verify": self.verify_cache.get_stats()
+            },
+            "sign_batching": self.sign_coalescer.get_stats()
         }
 
 
@@ -315,19 +754,26 @@ app = Flask(__name__)
 service = QuantumSecurityService()
 
 def rate_limit_check(blockchain: str, max_requests: int = 1000) -> bool:
-    """Verificar rate limit"""
-    now = time.time()
-    limit = service.rate_limits[blockchain]
-    
-    if now > limit["reset_time"]:
-        limit["count"] = 0
-        limit["reset_time"] = now + 3600  # Reset a cada hora
+    """
+    Verificar rate limit: max_requests por janela por blockchain (teto) e,
+    com X-API-Key, um sub-limite por chave. O header não é autenticado:
+    trocar de chave não aumenta o teto da blockchain.
     
-    if limit["count"] >= max_requests:
+    O sub-limite é checado antes do teto: pedidos recusados pela chave não
+    consomem o teto compartilhado (um cliente não bloqueia a blockchain).
+    """
+    window = service.rate_limit_window_seconds
+    api_key = request.headers.get("X-API-Key")
+    key_bucket = None
+    if api_key:
+        key_bucket = f"{blockchain}|{api_key}|{max_requests}"
+        sub_limit = max(1, int(max_requests * service.rate_limit_api_key_share))
+        if not service.rate_limiter.allow(key_bucket, sub_limit, window):
+            return False
+    if not service.rate_limiter.allow(f"{blockchain}|*|{max_requests}", max_requests, window):
+        if key_bucket is not None:
+            service.rate_limiter.refund(key_bucket)
         return False
-    
-    limit["count"] += 1
-    service.stats["total_requests"] += 1
     return True
 
 def require_blockchain(f):
@@ -381,7 +827,7 @@ def sign_transaction():
     if not rate_limit_check(blockchain):
         return jsonify({"error": "Rate limit exceeded"}), 429
     
-    result = service.sign_transaction(blockchain, transaction_hash, keypair_id, algorithm)
+    result = service.sign_transaction(blockchain, transaction_hash, keypair_id, algorithm, coalesce=True)
     return jsonify(result), 200 if result.get("success") else 500
 
 @app.route('/api/v1/signature/verify', methods=['POST'])
@@ -404,6 +850,44 @@ def verify_signature():
     result = service.verify_signature(blockchain, transaction_hash, signature, public_key, algorithm)
     return jsonify(result), 200
 
+@app.route('/api/v1/signature/verify/batch', methods=['POST'])
+@require_blockchain
+def batch_verify():
+    """
+    Verificar assinaturas em lote
+    
+    Corpo: {"items": [{transaction_hash, signature, public_key}, ...]} ou arrays
+    paralelos "transaction_hashes" + "signatures" com "public_keys" (por item)
+    ou "public_key" (compartilhada)
+    """
+    data = request.json
+    blockchain = data.get("blockchain")
+    algorithm = data.get("algorithm", "ML-DSA-128")
+    
+    items = data.get("items")
+    if items is None:
+        hashes = data.get("transaction_hashes") or []
+        signatures = data.get("signatures") or []
+        public_keys = data.get("public_keys") or [data.get("public_key")] * len(hashes)
+        if not (len(hashes) == len(signatures) == len(public_keys)):
+            return jsonify({"error": "transaction_hashes, signatures and public_keys must have the same length"}), 400
+        items = [
+            {"transaction_hash": tx_hash, "signature": signature, "public_key": public_key}
+            for tx_hash, signature, public_key in zip(hashes, signatures, public_keys)
+        ]
+    
+    if not items or not isinstance(items, list):
+        return jsonify({"error": "items (or transaction_hashes and signatures) required"}), 400
+    
+    if len(items) > service.max_batch_size:
+        return jsonify({"error": f"Batch too large (max {service.max_batch_size} items)"}), 413
+    
+    if not rate_limit_check(blockchain, max_requests=5000):  # Maior limite para batch
+        return jsonify({"error": "Rate limit exceeded"}), 429
+    
+    result = service.batch_verify(blockchain, [item if isinstance(item, dict) else {} for item in items], algorithm)
+    return jsonify(result), 200
+
 @app.route('/api/v1/signature/batch', methods=['POST'])
 @require_blockchain
 def batch_sign():
@@ -417,9 +901,23 @@ def batch_sign():
     if not transactions or not keypair_id:
         return jsonify({"error": "transactions and keypair_id required"}), 400
     
+    if len(transactions) > service.max_batch_size:
+        return jsonify({"error": f"Batch too large (max {service.max_batch_size} transactions)"}), 413
+    
     if not rate_limit_check(blockchain, max_requests=5000):  # Maior limite para batch
         return jsonify({"error": "Rate limit exceeded"}), 429
     
+    try:
+        stream = _json_flag(data.get("stream"), False)
+        ordered = _json_flag(data.get("ordered"), True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Streaming NDJSON: {"stream": true} ou Accept: application/x-ndjson
+    if stream or "application/x-ndjson" in request.headers.get("Accept", ""):
+        lines = service.stream_batch_sign(blockchain, transactions, keypair_id, algorithm, ordered=ordered)
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson"), 200
+    
     result = service.batch_sign(blockchain, transactions, keypair_id, algorithm)
     return jsonify(result), 200
 
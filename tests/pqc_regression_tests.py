@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes de Regressão PQC - Allianza Blockchain
+Cenários de segurança/robustez do QuantumSecuritySystem e do serviço QaaS
+(executável direto ou via pytest)
+"""
+
+import sys
+import base64
+import hashlib
+from pathlib import Path
+
+# Adicionar raiz do projeto ao path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+
+def test_multisig_forged_ecdsa_does_not_meet_threshold():
+    """ECDSA forjado (sem chave privada) não conta para o threshold do multi-sig"""
+    from quantum_security import QuantumSecuritySystem
+
+    qss = QuantumSecuritySystem()
+    try:
+        wallet = qss.generate_pqc_multisig_wallet(threshold=2, total_keys=3)
+        assert wallet["success"], wallet
+        keys = {k["algorithm"].split(" (")[0]: k["key_id"] for k in wallet["keys"]}
+        message = b"multisig forgery check"
+
+        # Assinatura legítima ECDSA + ML-DSA continua válida
+        signed = qss.sign_with_multisig(wallet["wallet_id"], message, [keys["ECDSA"], keys["ML-DSA"]])
+        assert signed["success"], signed
+        assert qss.verify_multisig(signed["multisig_signature"], message)["valid"]
+
+        ml_dsa_entry = next(s for s in signed["multisig_signature"]["signatures"] if s["key_id"] == keys["ML-DSA"])
+        for forged in (
+            hashlib.sha3_256(f"{keys['ECDSA']}{message.decode()}".encode()).hexdigest(),  # formato antigo
+            base64.b64encode(b"\x30" * 72).decode(),
+            "",
+        ):
+            forged_signature = {
+                "wallet_id": wallet["wallet_id"],
+                "signatures": [
+                    {"key_id": keys["ECDSA"], "algorithm": "ECDSA", "signature": forged},
+                    ml_dsa_entry,
+                ],
+            }
+            result = qss.verify_multisig(forged_signature, message)
+            assert result["success"], result
+            assert result["valid_signatures"] == 1, result
+            assert not result["valid"], result
+
+        # Assinatura ECDSA legítima não vale para outra mensagem
+        ecdsa_entry = next(s for s in signed["multisig_signature"]["signatures"] if s["key_id"] == keys["ECDSA"])
+        replayed = {"wallet_id": wallet["wallet_id"], "signatures": [ecdsa_entry, ml_dsa_entry]}
+        assert not qss.verify_multisig(replayed, b"outra mensagem")["valid"]
+    finally:
+        qss.shutdown()
+
+
+def test_rate_limit_api_key_rejections_do_not_drain_blockchain_ceiling():
+    """Pedidos recusados pelo sub-limite de uma X-API-Key não consomem o teto da blockchain"""
+    import quantum_security_service as qaas
+
+    blockchain = "regression-rate-limit"
+    max_requests = 20
+    share = qaas.service.rate_limit_api_key_share
+
+    def attempt(api_key):
+        with qaas.app.test_request_context(headers={"X-API-Key": api_key}):
+            return qaas.rate_limit_check(blockchain, max_requests=max_requests)
+
+    allowed_a = sum(attempt("client-a") for _ in range(max_requests * 5))
+    assert allowed_a == int(max_requests * share), allowed_a
+
+    # O teto ainda tem espaço para outra chave
+    allowed_b = sum(attempt("client-b") for _ in range(max_requests * 5))
+    assert allowed_b == max_requests - allowed_a, allowed_b
+
+    # Teto esgotado: recusa para todos e o sub-limite da chave é devolvido
+    assert not attempt("client-c")
+    with qaas.app.test_request_context():
+        assert not qaas.rate_limit_check(blockchain, max_requests=max_requests)
+    qaas.service.rate_limiter.reset(f"{blockchain}|*|{max_requests}")
+    assert attempt("client-c")
+
+
+def test_missing_keypair_same_error_with_negative_cache():
+    """Keypair inexistente: mesma resposta na 1ª chamada e nas servidas pelo cache negativo"""
+    from quantum_security_service import QuantumSecurityService
+
+    class MissingKeyManager:
+        calls = 0
+
+        def sign_ml_dsa(self, keypair_id, data):
+            MissingKeyManager.calls += 1
+            raise KeyError(keypair_id)
+
+    service = QuantumSecurityService()
+    service.key_manager = MissingKeyManager()
+    tx_hash = "ab" * 32
+    first = service.sign_transaction("ethereum", tx_hash, "inexistente", coalesce=False)
+    again = service.sign_transaction("ethereum", tx_hash, "inexistente", coalesce=False)
+    assert not first["success"] and first["error_code"] == "keypair_not_found", first
+    assert first == again, (first, again)
+    assert MissingKeyManager.calls == 1
+
+
+def test_time_lock_rejects_non_positive_difficulty():
+    """difficulty < 1 é recusada na criação (antes: ZeroDivisionError no status)"""
+    from quantum_security import QuantumSecuritySystem
+    from time_lock_engine import TimeLockEngine
+
+    qss = QuantumSecuritySystem()
+    try:
+        for difficulty in (0, -1, True, 1.5):
+            result = qss.create_time_lock_encryption(b"time-lock", 1, difficulty=difficulty)
+            assert not result["success"], result
+        assert qss.get_time_lock_status("inexistente")["success"] is False
+
+        engine = TimeLockEngine(calibrate_on_start=False)
+        try:
+            engine.submit(b"seed", 0)
+            raise AssertionError("submit aceitou difficulty=0")
+        except ValueError:
+            pass
+        job_id = engine.submit(b"seed", 1)
+        assert engine.wait(job_id, timeout=30)["progress_percent"] == 100.0
+        engine.shutdown()
+    finally:
+        qss.shutdown()
+
+
+def main():
+    """Executa todos os testes de regressão"""
+    tests = [(name, func) for name, func in globals().items() if name.startswith("test_") and callable(func)]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+    print(f"\n📊 {len(tests) - failed}/{len(tests)} testes passaram")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
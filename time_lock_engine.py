@@ -0,0 +1,348 @@
+# time_lock_engine.py
+# ⏳ MOTOR DE TIME-LOCK (HASH ITERADO) FORA DA THREAD DO CHAMADOR
+"""
+Cadeia sequencial sha3_512 executada em processo separado.
+
+- Cada puzzle vira um job com id, status e progresso (poll)
+- Checkpoints igualmente espaçados permitem verificar a cadeia em
+  segmentos paralelos (um processo por segmento) em vez de refazer
+  a cadeia inteira sequencialmente
+- Calibração: hashes/s medidos no host (em background, uma vez) para
+  derivar `difficulty` a partir de um tempo alvo
+- Número fixo de threads despachantes (max_concurrent_jobs), alimentadas
+  por uma fila: jobs enfileirados não criam threads
+"""
+
+import time
+import queue
+import hashlib
+import secrets
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+PROGRESS_STEP = 10000  # iterações entre atualizações de progresso
+
+
+def _run_chain(seed: bytes, difficulty: int, checkpoint_interval: int, progress, conn):
+    """Executar a cadeia (processo worker) enviando checkpoints + hash final pelo pipe"""
+    try:
+        sha3_512 = hashlib.sha3_512
+        current = seed
+        done = 0
+        checkpoints = []
+        next_checkpoint = checkpoint_interval
+        started = time.perf_counter()
+        while done < difficulty:
+            steps = min(PROGRESS_STEP, next_checkpoint - done, difficulty - done)
+            for _ in range(steps):
+                current = sha3_512(current).digest()
+            done += steps
+            progress.value = done
+            if done == next_checkpoint or done == difficulty:
+                checkpoints.append((done, current))
+                next_checkpoint += checkpoint_interval
+        conn.send({
+            "success": True,
+            "final_hash": current,
+            "checkpoints": checkpoints,
+            "compute_seconds": time.perf_counter() - started
+        })
+    except Exception as e:
+        conn.send({"success": False, "error": str(e)})
+    finally:
+        conn.close()
+
+
+def _verify_segment(start_hash: bytes, steps: int, expected: bytes) -> bool:
+    """Refazer um segmento da cadeia e comparar com o checkpoint"""
+    sha3_512 = hashlib.sha3_512
+    current = start_hash
+    for _ in range(steps):
+        current = sha3_512(current).digest()
+    return current == expected
+
+
+def _chain_hash_rate(iterations: int) -> float:
+    sha3_512 = hashlib.sha3_512
+    current = b"calibration"
+    start = time.perf_counter()
+    for _ in range(iterations):
+        current = sha3_512(current).digest()
+    return iterations / (time.perf_counter() - start)
+
+
+class TimeLockEngine:
+    """Gerenciador de jobs de time-lock em processos separados"""
+
+    def __init__(self, max_concurrent_jobs: int = 2, max_finished_jobs: int = 1000, calibrate_on_start: bool = True):
+        """
+        calibrate_on_start: medir hashes/s numa thread de background já na
+        criação, para que difficulty=None não espere pela calibração
+        """
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        self.max_finished_jobs = max_finished_jobs
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._dispatchers: List[threading.Thread] = []
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._finished_order: List[str] = []
+        self._lock = threading.Lock()
+        self._calibration_lock = threading.Lock()
+        self._hash_rate: Optional[float] = None
+        self._closed = False
+        self._completed = 0
+        self._failed = 0
+        if calibrate_on_start:
+            threading.Thread(target=self.calibrate, name="timelock-calibration", daemon=True).start()
+
+    # -------------------------------------------------------------------------
+    # Calibração
+    # -------------------------------------------------------------------------
+
+    def calibrate(self, sample_iterations: int = 200000, force: bool = False) -> float:
+        """Medir hashes sha3_512 encadeados por segundo neste host (resultado em cache)"""
+        with self._calibration_lock:
+            if self._hash_rate is None or force:
+                self._hash_rate = _chain_hash_rate(sample_iterations)
+            return self._hash_rate
+
+    @property
+    def calibrated(self) -> bool:
+        return self._hash_rate is not None
+
+    def difficulty_for(self, target_seconds: float) -> int:
+        """Dificuldade para que a cadeia leve ~target_seconds neste host"""
+        return max(1, int(self.calibrate() * target_seconds))
+
+    @staticmethod
+    def validate_difficulty(difficulty: Any) -> int:
+        """Dificuldade precisa ser um inteiro >= 1 (ValueError caso contrário)"""
+        if isinstance(difficulty, bool) or not isinstance(difficulty, int) or difficulty < 1:
+            raise ValueError(f"difficulty deve ser um inteiro >= 1 (recebido: {difficulty!r})")
+        return difficulty
+
+    # -------------------------------------------------------------------------
+    # Jobs
+    # -------------------------------------------------------------------------
+
+    def submit(
+        self,
+        seed: bytes,
+        difficulty: Optional[int],
+        checkpoints: int = 16,
+        job_id: Optional[str] = None,
+        metadata: Optional[Dict] = None,
+        target_seconds: Optional[float] = None
+    ) -> str:
+        """
+        Enfileirar cadeia de `difficulty` iterações; retorna job_id.
+        difficulty=None: derivada de target_seconds pela calibração, na
+        thread despachante (a do chamador não mede hashes/s)
+        """
+        if self._closed:
+            raise RuntimeError("TimeLockEngine encerrado")
+        if difficulty is None:
+            if target_seconds is None or not target_seconds > 0:
+                raise ValueError("target_seconds deve ser > 0 quando difficulty=None")
+            if self.calibrated:
+                difficulty = self.difficulty_for(target_seconds)
+        else:
+            self.validate_difficulty(difficulty)
+        job_id = job_id or f"tljob_{int(time.time())}_{secrets.token_hex(8)}"
+        job = {
+            "job_id": job_id,
+            "seed": seed,
+            "difficulty": difficulty,
+            "target_seconds": target_seconds,
+            "checkpoints": max(1, checkpoints),
+            "checkpoint_interval": None,
+            "status": "queued",
+            "progress": multiprocessing.Value("q", 0, lock=False),
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "metadata": metadata or {},
+            "process": None,
+            "done": threading.Event()
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            # Threads despachantes criadas sob demanda, no máximo max_concurrent_jobs
+            if len(self._dispatchers) < self.max_concurrent_jobs:
+                dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name=f"timelock-dispatch-{len(self._dispatchers)}", daemon=True
+                )
+                self._dispatchers.append(dispatcher)
+                dispatcher.start()
+        self._queue.put(job)
+        return job_id
+
+    def _dispatch_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if self._closed:
+                self._finish(job, {"success": False, "error": "TimeLockEngine encerrado"})
+                continue
+            try:
+                result = self._run_job(job)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            self._finish(job, result)
+
+    def _run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        if job["difficulty"] is None:
+            job["difficulty"] = self.difficulty_for(job["target_seconds"])
+        difficulty = job["difficulty"]
+        job["checkpoint_interval"] = -(-difficulty // min(job["checkpoints"], difficulty))  # ceil
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_run_chain,
+            args=(job["seed"], difficulty, job["checkpoint_interval"], job["progress"], child_conn),
+            daemon=True
+        )
+        job["process"] = process
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        try:
+            process.start()
+            child_conn.close()
+            return parent_conn.recv()
+        except (EOFError, OSError) as e:
+            return {"success": False, "error": f"Worker encerrado: {e}"}
+        finally:
+            if process.pid is not None:
+                process.join()
+            parent_conn.close()
+            job["process"] = None
+
+    def _finish(self, job: Dict[str, Any], result: Dict[str, Any]):
+        job["result"] = result
+        job["status"] = "completed" if result.get("success") else "failed"
+        job["finished_at"] = time.time()
+        job["done"].set()
+        with self._lock:
+            if result.get("success"):
+                self._completed += 1
+            else:
+                self._failed += 1
+            # Limitar quantos jobs finalizados ficam em memória
+            self._finished_order.append(job["job_id"])
+            while len(self._finished_order) > self.max_finished_jobs:
+                self._jobs.pop(self._finished_order.pop(0), None)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job["done"].wait(timeout)
+        return self.poll(job_id)
+
+    def poll(self, job_id: str) -> Dict[str, Any]:
+        """Status + progresso do job; inclui hash final e checkpoints quando concluído"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return {"success": False, "error": "Job de time-lock não encontrado"}
+
+        done = job["progress"].value
+        difficulty = job["difficulty"]  # None até a calibração resolver
+        status = {
+            "success": True,
+            "job_id": job_id,
+            "status": job["status"],
+            "difficulty": difficulty,
+            "iterations_done": done,
+            "progress_percent": done / difficulty * 100 if difficulty else 0.0,
+            "metadata": job["metadata"]
+        }
+        if job["started_at"]:
+            elapsed = (job["finished_at"] or time.time()) - job["started_at"]
+            status["elapsed_seconds"] = elapsed
+            if done and difficulty and job["status"] == "running":
+                status["eta_seconds"] = elapsed * (difficulty - done) / done
+
+        result = job["result"]
+        if result is not None:
+            if result.get("success"):
+                status["final_hash"] = result["final_hash"]
+                status["checkpoints"] = result["checkpoints"]
+                status["compute_seconds"] = result["compute_seconds"]
+            else:
+                status["success"] = False
+                status["error"] = result.get("error")
+        return status
+
+    def get_stats(self) -> Dict[str, Any]:
+        jobs = list(self._jobs.values())
+        return {
+            "hash_rate_per_second": self._hash_rate,
+            "max_concurrent_jobs": self.max_concurrent_jobs,
+            "dispatcher_threads": len(self._dispatchers),
+            "queued": sum(1 for job in jobs if job["status"] == "queued"),
+            "running": sum(1 for job in jobs if job["status"] == "running"),
+            "completed": self._completed,
+            "failed": self._failed
+        }
+
+    def shutdown(self, terminate: bool = True):
+        """
+        Recusar novos jobs, falhar os enfileirados e (opcionalmente) terminar
+        os processos em execução
+        """
+        self._closed = True
+        with self._lock:
+            dispatchers = len(self._dispatchers)
+        for _ in range(dispatchers):
+            self._queue.put(None)
+        if terminate:
+            for job in list(self._jobs.values()):
+                process = job["process"]
+                if process is not None and process.is_alive():
+                    process.terminate()
+
+    # -------------------------------------------------------------------------
+    # Verificação paralela por segmentos
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def verify(
+        seed: bytes,
+        checkpoints: List[Tuple[int, bytes]],
+        final_hash: Optional[bytes] = None,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Verificar a cadeia: cada segmento (checkpoint anterior -> checkpoint)
+        é refeito em paralelo em processos separados.
+        """
+        if not checkpoints:
+            return {"success": False, "valid": False, "error": "Sem checkpoints"}
+        if final_hash is not None and checkpoints[-1][1] != final_hash:
+            return {"success": True, "valid": False, "error": "Hash final não corresponde ao último checkpoint"}
+
+        segments = []
+        previous_index, previous_hash = 0, seed
+        for index, checkpoint_hash in checkpoints:
+            if index <= previous_index:
+                return {"success": False, "valid": False, "error": "Checkpoints fora de ordem"}
+            segments.append((previous_hash, index - previous_index, checkpoint_hash))
+            previous_index, previous_hash = index, checkpoint_hash
+
+        start = time.perf_counter()
+        if len(segments) == 1 or max_workers == 1:
+            segment_results = [_verify_segment(*segment) for segment in segments]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                segment_results = list(executor.map(_verify_segment, *zip(*segments)))
+
+        invalid = [i for i, ok in enumerate(segment_results) if not ok]
+        return {
+            "success": True,
+            "valid": not invalid,
+            "segments": len(segments),
+            "invalid_segments": invalid,
+            "iterations": previous_index,
+            "verify_seconds": time.perf_counter() - start
+        }